@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmarker for Cocktail Lang
+
+Usage:
+    bench <program-id> [options]
+
+Options:
+    -n repeat       Number of runs to take the best time of [default: 3]
+    --memory        Also measure the peak memory of a run
+    --serve         Also compare the latency of cold runs with the runs of
+                    a server
+    --unboxed       Keep numbers, strings and booleans as native values
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from subprocess import DEVNULL, Popen, run
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+from tracemalloc import get_traced_memory, start as trace, stop as untrace
+
+try:
+    from cocktail.docopt import docopt
+except (ImportError, ModuleNotFoundError):
+    from docopt import docopt
+
+from cocktail.error import CocktailError
+from cocktail.parser import parse
+from cocktail.server import Client
+
+
+def main(argv=None):
+    args = docopt(__doc__, argv)
+
+    try:
+        _bench(args)
+    except CocktailError as err:
+        exit(f'{err}')
+
+
+def _bench(args):
+    program_id = args['<program-id>']
+    path = Path(f'benchmarks/{program_id}.cocktail')
+
+    if not path.exists():
+        exit(f'{Path(__file__)}: {path}: No such file or directory')
+    elif path.is_dir():
+        exit(f'{Path(__file__)}: {path}: Is a directory')
+
+    with open(path) as file:
+        source = file.read()
+
+    start = perf_counter()
+    module = parse(source, path=f'{path}', log='none',
+                   unboxed=args['--unboxed'])
+    parse_time = perf_counter() - start
+
+    times = []
+    for _ in range(int(args['-n'])):
+        with redirect_stdout(StringIO()):
+            start = perf_counter()
+            module.eval()
+            times.append(perf_counter() - start)
+
+    print(f'{program_id}: parse {parse_time * 1000:.1f} ms, '
+          f'run {min(times) * 1000:.1f} ms (best of {len(times)})')
+
+    if args['--memory']:
+        with redirect_stdout(StringIO()):
+            trace()
+            module.eval()
+            peak = get_traced_memory()[1]
+            untrace()
+
+        print(f'{program_id}: peak memory {peak / 1024:.1f} KiB')
+
+    if args['--serve']:
+        _bench_serve(program_id, path, int(args['-n']), args['--unboxed'])
+
+
+def _best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def _bench_serve(program_id, path, repeat, unboxed):
+    # the cold runs, the runs forwarded by the client of the command line,
+    # and the requests from this process, each on a new connection
+    options = ['-u'] if unboxed else []
+    command = [sys.executable, '-m', 'cocktail', *options]
+    path = f'{path.resolve()}'
+
+    cold = _best_time(
+        lambda: run([*command, path], stdout=DEVNULL, check=True), repeat,
+    )
+
+    with TemporaryDirectory() as directory:
+        address = f'{directory}/cocktail.sock'
+        server = Popen([*command, '--serve', address])
+
+        try:
+            while not Path(address).exists():
+                if server.poll() is not None:
+                    exit(f'{Path(__file__)}: the server failed to start')
+                sleep(0.05)
+
+            client = _best_time(
+                lambda: run([*command, '--connect', address, path],
+                            stdout=DEVNULL, check=True),
+                repeat,
+            )
+
+            def request():
+                with Client(address) as client:
+                    client.request(path=path)
+
+            served = _best_time(request, repeat)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f'{program_id}: cold {cold * 1000:.1f} ms, '
+          f'client {client * 1000:.1f} ms, '
+          f'served {served * 1000:.1f} ms (best of {repeat})')
+
+
+if __name__ == '__main__':
+    main()
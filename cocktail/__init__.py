@@ -2,21 +2,46 @@ from .ast import *
 from .ast import __all__ as __ast_all__
 from .astprint import *
 from .astprint import __all__ as __astprint_all__
+from .batch import *
+from .batch import __all__ as __batch_all__
+from .error import *
+from .error import __all__ as __error_all__
+from .frame import *
+from .frame import __all__ as __frame_all__
 from .moduleinfo import *
 from .moduleinfo import __all__ as __moduleinfo_all__
 from .obj import *
 from .obj import __all__ as __obj_all__
+from .interpreter import *
+from .interpreter import __all__ as __interpreter_all__
 from .lexer import *
+from .lines import *
+from .lines import __all__ as __lines_all__
 from .lexer import __all__ as __lexer_all__
+from .output import *
+from .output import __all__ as __output_all__
 from .parser import *
 from .parser import __all__ as __parser_all__
+from .regex import *
+from .regex import __all__ as __regex_all__
+from .resolver import *
+from .resolver import __all__ as __resolver_all__
 from .run import *
 from .run import __all__ as __run_all__
+from .server import *
+from .server import __all__ as __server_all__
+from .source import *
+from .source import __all__ as __source_all__
+from .view import *
+from .view import __all__ as __view_all__
 
 
 __version__ = '0.1.0'
 __version_info__ = tuple(int(segment) for segment in __version__.split('.'))
 __all__ = (
-    __ast_all__ + __astprint_all__ + __moduleinfo_all__ + __obj_all__ +
-    __lexer_all__ + __parser_all__ + __run_all__
+    __ast_all__ + __astprint_all__ + __batch_all__ + __error_all__ +
+    __frame_all__ + __interpreter_all__ + __moduleinfo_all__ + __obj_all__ +
+    __lexer_all__ + __lines_all__ + __output_all__ + __parser_all__ +
+    __regex_all__ + __resolver_all__ + __run_all__ + __server_all__ +
+    __source_all__ + __view_all__
 )
@@ -3,28 +3,48 @@ The Cocktail Lang.
   The Cocktail Lang helps you to create speedy and beautiful code easily.
 
 Usage:
-  cocktail [options] ... [-c cmd | <file>] [-o output]
+  cocktail batch [options] [<job>...] [-o output]
+  cocktail [options] ... [--connect sock] [-c cmd | <file>] [-o output]
+  cocktail --serve [<socket>] [options]
 
 Options:
   --ast -a        Parse the file and output the abstract syntax tree
   -c cmd          Execute the line of code
+  --connect sock  Execute on the server at the Unix socket instead
   --debug -d      Show warnings for debug
   --help -h       Show this help message and exit
+  -j workers      Run the batch on the workers, 0 for one a CPU [default: 0]
   --lex -l        Lex the file and output the tokens
   -o output       Print the output to the file
+  --serve         Run a server for JSON-lines requests, at the Unix socket
+                  or on the standard input and output
+  --timeout secs  Stop the jobs of the batch running longer
+  --unboxed -u    Keep numbers, strings and booleans as native values
   --version -v    Show Cocktail version number and exit
 """
 
+from json import dumps
+from os import fstat
 from pathlib import Path
+from signal import SIGTERM, signal
+from stat import S_ISFIFO, S_ISREG
+import sys
+from time import perf_counter
 
 from .docopt import docopt
 
 from .__init__ import __version__
+from .ast import RECURSION_LIMIT
 from .astprint import astprint
+from .batch import WorkerPool, batch_report
+from .error import CocktailError
+from .interpreter import Interpreter
 from .lexer import lex
-from .run import execute, tokenize
+from .run import execute, execute_file, tokenize
 from .moduleinfo import ModuleInfo
+from .output import OutputSink
 from .parser import get_parser
+from .server import Client, Server
 
 
 def _get_file(args):
@@ -40,7 +60,89 @@ def _get_file(args):
 def main(argv=None):
     args = docopt(__doc__, argv=argv, version=f'Cocktail {__version__}')
 
-    if args['<file>']:
+    try:
+        _main(args)
+    except CocktailError as err:
+        exit(f'{err}')
+
+
+def _serve(args):
+    server = Server(Interpreter(unboxed=args['--unboxed'],
+                                recursion_limit=RECURSION_LIMIT))
+
+    if args['<socket>'] is None:
+        # the programs print to their responses, not to the standard output
+        server.serve_stream(sys.stdin, sys.stdout)
+    else:
+        # stopped like when interrupted, removing the socket file
+        signal(SIGTERM, lambda signum, frame: exit())
+        try:
+            server.serve_socket(args['<socket>'])
+        except OSError as err:
+            exit(f'{Path(__file__)}: {args["<socket>"]}: {err.strerror}')
+
+
+def _connect(args, output, request):
+    # the input of the program is sent with the request, if it is piped or
+    # redirected from a file, as the terminals and the sockets might never
+    # end
+    mode = fstat(sys.stdin.fileno()).st_mode
+    stdin = sys.stdin.read() if S_ISFIFO(mode) or S_ISREG(mode) else ''
+
+    try:
+        with Client(args['--connect']) as client:
+            response = client.request(stdin=stdin, **request)
+    except OSError as err:
+        exit(f'{Path(__file__)}: {args["--connect"]}: {err.strerror or err}')
+
+    print(response['output'], end='', file=output)
+    if response['status'] != 0:
+        exit(response['error'])
+
+
+def _batch(args):
+    output = _get_file(args)
+    if output is None:
+        output = sys.stdout
+
+    # the options repeat, the last ones are taken
+    try:
+        workers = int(args['-j'][-1]) or None
+        timeout = float(args['--timeout'][-1]) if args['--timeout'] else None
+    except ValueError as err:
+        exit(f'{Path(__file__)}: {err}')
+
+    # the paths of the jobs are read from the standard input if not given
+    if args['<job>']:
+        paths = args['<job>']
+    else:
+        paths = (line.strip() for line in sys.stdin if line.strip())
+
+    interpreter = Interpreter(unboxed=args['--unboxed'],
+                              recursion_limit=RECURSION_LIMIT)
+    results = []
+    start = perf_counter()
+
+    with WorkerPool(interpreter, workers=workers, timeout=timeout) as pool:
+        for result in pool.run(paths):
+            print(dumps(result), file=output, flush=True)
+            results.append({'status': result['status'],
+                            'times': result['times']})
+
+    print(batch_report(results, perf_counter() - start), file=sys.stderr)
+
+    if any(result['status'] != 0 for result in results):
+        exit(1)
+
+
+def _main(args):
+    if args['--serve']:
+        _serve(args)
+
+    elif args['batch']:
+        _batch(args)
+
+    elif args['<file>']:
         output_used = args['-o'] is not None
         output = _get_file(args)
 
@@ -53,10 +155,14 @@ def main(argv=None):
 
         debug = args['--debug']
 
-        with open(path) as file:
-            source = file.read()
+        if args['--lex'] or args['--ast']:
+            with open(path) as file:
+                source = file.read()
 
-        if args['--lex']:
+        if args['--connect'] is not None:
+            # the server may run in another directory
+            _connect(args, output, {'path': f'{path.resolve()}'})
+        elif args['--lex']:
             for token in tokenize(source, path=path):
                 print(token, file=output)
         elif args['--ast']:
@@ -70,13 +176,24 @@ def main(argv=None):
 
             astprint(ast, file=output)
         else:
-            execute(source, path=f'{path}', log='default' if debug else 'none')
+            execute_file(f'{path}', log='default' if debug else 'none',
+                         unboxed=args['--unboxed'],
+                         output=None if output is None else OutputSink(output),
+                         recursion_limit=RECURSION_LIMIT)
 
     elif args['-c'] is not None:
         debug = args['--debug']
+        output = _get_file(args)
+
+        if args['--connect'] is not None:
+            _connect(args, output, {'source': args['-c']})
+            return
 
         execute(
-            args['-c'], path='<string>', log='default' if debug else 'none'
+            args['-c'], path='<string>', log='default' if debug else 'none',
+            unboxed=args['--unboxed'],
+            output=None if output is None else OutputSink(output),
+            recursion_limit=RECURSION_LIMIT,
         )
 
     else:
@@ -1,15 +1,26 @@
 from builtins import type as builtin_type
 from copy import deepcopy
 from dataclasses import dataclass, field
-from re import compile as re_compile, error as re_error, match as re_match
+from functools import reduce
+from re import error as re_error
+from sys import getrecursionlimit, setrecursionlimit
 from typing import (
     Dict as TypingDict, List as TypingList, Tuple as TypingTuple, Union
 )
 
 from .rply.token import BaseBox, Token
 
+from . import output
+from .dispatch import (
+    BINARY_DISPATCH, COMPARE_DISPATCH, INPLACE_DISPATCH, binary_function,
+    compare_function, inplace_function,
+)
 from .error import throw
+from .frame import UNBOUND, Frame
+from .lines import read_lines
 from .obj import *
+from .regex import compile_pattern
+from .vector import reduction
 
 
 __all__ = [
@@ -27,13 +38,15 @@ __all__ = [
     'String',
     'Tuple',
     'List',
+    'Dict',
+    'Set',
     'Slice',
 
     'ExprContent',
     'Load',
     'Store',
 
-    'Name',
+    'Name', 'GlobalName',
 
     'BinOp',
     'Operator',
@@ -72,6 +85,44 @@ class Ast(BaseBox):
     info = None
 
 
+class _Status:
+    __slots__ = ('name',)
+
+    def __init__(self, name, /):
+        self.name = name
+
+    def __repr__(self, /):
+        return f'<{self.name}>'
+
+
+# returned by the statements to the loop or the function around them, every
+# other result of a statement means that it completed normally
+BREAK = _Status('break')
+CONTINUE = _Status('continue')
+RETURN = _Status('return')
+
+
+class _ProgramExit(Exception):
+    pass
+
+
+def _run(body, env, /):
+    # runs a block that may break or continue the loop around it, or return
+    # from the function around it
+    for stmt in body:
+        if ((status := stmt.eval(env=env)) is BREAK or status is CONTINUE or
+                status is RETURN):
+            return status
+
+
+def _whole(value, /):
+    # the whole floats are integers as indices and bounds, like they are for
+    # the bitwise operators
+    if type(value) is float and value % 1 == 0:
+        return int(value)
+    return value
+
+
 Name = type('Name', (Ast,), {})
 Operator = type('Operator', (Ast,), {})
 UnaryOperator = type('UnaryOperator', (Ast,), {})
@@ -80,6 +131,10 @@ CmpOp = type('CmpOp', (Ast,), {})
 Arguments = type('Arguments', (Ast,), {})
 
 
+# the recursion limit of Python while the programs of the command line run
+RECURSION_LIMIT = 20000
+
+
 @dataclass
 class Module(Ast):
     _fields = ('body',)
@@ -87,20 +142,33 @@ class Module(Ast):
 
     def __init__(self, body=None):
         self.body = [] if body is None else body
+        self.slots = None
+        self.model = BOXED
+
+    def eval(self, /, *, recursion_limit=None):
+        if self.slots is None:
+            from .resolver import resolve
+            resolve(self, model=self.model)
 
-    def eval(self, /):
-        env = DEFAULT_ENV.copy()
+        env = Frame(self.slots, self.model)
+        for name, value in DEFAULT_ENV.items():
+            env.values[self.slots[name]] = self.model.convert(value)
 
-        for stmt in self.body:
-            result = stmt.eval(env=env)
-            if isinstance(result, ScopeStmt) and not isinstance(result, Exit):
-                throw(stmt.info, stmt.token, 'SyntaxError',
-                      f"cannot use '{type(stmt).__name__.lower()}'"
-                      f" outside loop")
-            elif isinstance(result, FunctionStmt):
-                throw(stmt.info, stmt.token, 'SyntaxError',
-                      f"cannot use '{type(stmt).__name__.lower()}'"
-                      f" outside function definition")
+        # the limit of Python is raised while the module runs if asked, as
+        # every call of the programs takes several frames of Python
+        limit = getrecursionlimit()
+        if recursion_limit is not None:
+            setrecursionlimit(max(limit, recursion_limit))
+
+        # the placement of the loop controls is checked by the resolver
+        try:
+            for stmt in self.body:
+                stmt.eval(env=env)
+        except _ProgramExit:
+            pass
+        finally:
+            setrecursionlimit(limit)
+            output.sink.flush()
 
         return ModuleType(env)
 
@@ -113,7 +181,7 @@ class Assign(Ast):
 
     def eval(self, /, *, env):
         value = self.value.eval(env=env)
-        env[self.target.eval(env=env).id] = value
+        env.values[self.target.slot] = value
         return value
 
 
@@ -125,10 +193,22 @@ class AugAssign(Ast):
     value: Ast
 
     def eval(self, /, *, env):
-        value = self.op.eval(env[self.target.eval(env=env).id], self.value,
-                             env=env)
-        env[self.target.eval(env=env).id] = value
-        return value
+        values, slot = env.values, self.target.slot
+        target_value = self.target.eval(env=env)
+        value = self.value.eval(env=env)
+
+        if (type(target_value) is str and type(value) is str and
+                self.op.symbol == '+'):
+            # with the variable cleared, CPython appends to the string in
+            # place unless it is referenced elsewhere too
+            values[slot] = None
+            target_value += value
+        else:
+            target_value = self.op.apply_inplace(target_value, value,
+                                                 node=self.target)
+
+        values[slot] = target_value
+        return target_value
 
 
 @dataclass
@@ -138,7 +218,7 @@ class Construct(Ast):
     args: TypingTuple[Ast]
 
     def eval(self, /, *, env):
-        return self.type.construct(*self.args, env=env)
+        return env.model.convert(self.type.construct(*self.args, env=env))
 
 
 @dataclass
@@ -155,8 +235,11 @@ class Constant(Ast):
     _fields = ('token',)
     token: Token
 
+    def __post_init__(self):
+        self.value = RESERVED[self.token.value]
+
     def eval(self, /, *, env):
-        return RESERVED[self.token.value]
+        return self.value
 
 
 @dataclass
@@ -164,8 +247,12 @@ class Number(Ast):
     _fields = ('token',)
     token: Token
 
+    def __post_init__(self):
+        text = self.token.value
+        self.value = NumberType(int(text) if text.isdigit() else float(text))
+
     def eval(self, /, *, env):
-        return NumberType(float(self.token.value))
+        return self.value
 
 
 @dataclass
@@ -173,8 +260,19 @@ class String(Ast):
     _fields = ('token',)
     token: Token
 
+    def __post_init__(self):
+        text = self.token.value
+
+        # only the escape sequences need the parsing of Python
+        if '\\' in text:
+            self.value = StringType(eval(text))
+        elif text[0] in 'Rr':
+            self.value = StringType(text[2:-1])
+        else:
+            self.value = StringType(text[1:-1])
+
     def eval(self, /, *, env):
-        return StringType(eval(self.token.value))
+        return self.value
 
 
 @dataclass
@@ -195,6 +293,42 @@ class List(Ast):
         return ListType([value.eval(env=env) for value in self.values])
 
 
+@dataclass
+class Dict(Ast):
+    _fields = ('keys', 'values')
+    keys: list
+    values: list
+
+    def eval(self, /, *, env):
+        entries = {}
+
+        for key, value in zip(self.keys, self.values):
+            key_value = key.eval(env=env)
+            try:
+                entries[hash_key(key_value)] = value.eval(env=env)
+            except TypeError as err:
+                throw(key.info, key.token, 'TypeError', f'{err}', line=True)
+
+        return DictType(entries, env.model)
+
+
+@dataclass
+class Set(Ast):
+    _fields = ('elts',)
+    elts: list
+
+    def eval(self, /, *, env):
+        values = set()
+
+        for elt in self.elts:
+            try:
+                values.add(hash_key(elt.eval(env=env)))
+            except TypeError as err:
+                throw(elt.info, elt.token, 'TypeError', f'{err}', line=True)
+
+        return SetType(values, env.model)
+
+
 @dataclass
 class Slice(Ast):
     _fields = ('start', 'stop', 'step')
@@ -207,41 +341,25 @@ class Slice(Ast):
         self.stop = stop
         self.step = step
 
-        self.token = start.token
-
     def eval(self, /, *, env):
-        start = none if self.start is none else self.start.eval(env=env)
-        stop = none if self.stop is none else self.stop.eval(env=env)
-        step = none if self.step is none else self.step.eval(env=env)
+        indices = []
 
-        if not isinstance(start, NoneType):
-            if not isinstance(start, NumberType):
-                throw(self.start.info, self.start.token, 'TypeError',
-                      f'Slice indices must be integers, '
-                      f'not {type(start).__name__}', line=True)
-            if start.value % 1 != 0:
-                throw(self.start.info, self.start.token, 'TypeError',
-                      f'Slice indices must be integers, not float', line=True)
+        for node in (self.start, self.stop, self.step):
+            value = none if node is none else node.eval(env=env)
 
-        if not isinstance(stop, NoneType):
-            if not isinstance(stop, NumberType):
-                throw(self.stop.info, self.stop.token, 'TypeError',
-                      f'Slice indices must be integers, '
-                      f'not {type(stop).__name__}', line=True)
-            if stop.value % 1 != 0:
-                throw(self.stop.info, self.stop.token, 'TypeError',
+            if value is none:
+                indices.append(None)
+            elif type(index := _whole(unbox(value))) is int:
+                indices.append(index)
+            elif type(index) is float:
+                throw(node.info, node.token, 'TypeError',
                       f'Slice indices must be integers, not float', line=True)
-
-        if not isinstance(step, NoneType):
-            if not isinstance(step, NumberType):
-                throw(self.step.info, self.step.token, 'TypeError',
+            else:
+                throw(node.info, node.token, 'TypeError',
                       f'Slice indices must be integers, '
-                      f'not {type(step).__name__}', line=True)
-            if step.value % 1 != 0:
-                throw(self.step.info, self.step.token, 'TypeError',
-                      f'Slice indices must be integers, not float', line=True)
+                      f'not {type_name(value)}', line=True)
 
-        return SliceType(start, stop, step)
+        return SliceType(*indices)
 
 
 @dataclass
@@ -269,15 +387,23 @@ class Name(Ast):
         self.token = token
         self.id = token.value
         self.ctx = ctx
+        self.slot = None
 
     def eval(self, /, *, env):
-        if isinstance(self.ctx, Load):
-            if self.id not in env:
-                throw(self.info, self.token, 'NameError',
-                      f"name '{self.id}' is not found")
-            return env[self.id]
-        else:
-            return NameType(self.id)
+        if (value := env.values[self.slot]) is UNBOUND:
+            throw(self.info, self.token, 'NameError',
+                  f"name '{self.id}' is not found")
+        return value
+
+
+class GlobalName(Name):
+    # the resolver turns the names in functions that are not local to them
+    # into global names, which are loaded from the frame of the module
+    def eval(self, /, *, env):
+        if (value := env.globals[self.slot]) is UNBOUND:
+            throw(self.info, self.token, 'NameError',
+                  f"name '{self.id}' is not found")
+        return value
 
 
 @dataclass
@@ -288,285 +414,126 @@ class BinOp(Ast):
     right: Ast
 
     def eval(self, /, *, env):
-        return self.op.eval(self.left, self.right, env=env)
+        return self.op.apply(self.left.eval(env=env),
+                             self.right.eval(env=env), node=self.left)
 
 
 @dataclass
 class Operator(Ast):
-    @staticmethod
-    def process(value, /, *, env):
-        if isinstance(value, Ast):
-            return value.eval(env=env)
-        else:
-            return value
+    symbol = None
+
+    @classmethod
+    def eval(cls, left, right, /, *, env):
+        return cls.apply(left.eval(env=env), right.eval(env=env), node=left)
+
+    @classmethod
+    def apply(cls, left_value, right_value, /, *, node):
+        try:
+            try:
+                func = BINARY_DISPATCH[
+                    type(left_value), type(right_value), cls.symbol
+                ]
+            except KeyError:
+                func = binary_function(cls.symbol, left_value, right_value)
+
+            if func is not None:
+                return func(left_value, right_value)
+        except (ArithmeticError, TypeError, ValueError) as err:
+            throw(node.info, node.token, type(err).__name__, f'{err}',
+                  line=True)
+
+        throw(node.info, node.token, 'TypeError',
+              f"unsupported operand type(s) for {cls.symbol}: "
+              f"'{type_name(left_value)}' and "
+              f"'{type_name(right_value)}'", line=True)
+
+    @classmethod
+    def apply_inplace(cls, left_value, right_value, /, *, node):
+        try:
+            try:
+                func = INPLACE_DISPATCH[
+                    type(left_value), type(right_value), cls.symbol
+                ]
+            except KeyError:
+                func = inplace_function(cls.symbol, left_value, right_value)
+
+            if (func is not None and
+                    (result := func(left_value, right_value))
+                    is not NotImplemented):
+                return result
+        except (ArithmeticError, TypeError, ValueError) as err:
+            throw(node.info, node.token, type(err).__name__, f'{err}',
+                  line=True)
+
+        throw(node.info, node.token, 'TypeError',
+              f"unsupported operand type(s) for {cls.symbol}=: "
+              f"'{type_name(left_value)}' and "
+              f"'{type_name(right_value)}'", line=True)
 
 
 @dataclass
 class Add(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__add__') and
-                (result := left_value.__add__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__radd__') and
-                (result := right_value.__radd__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for +: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '+'
 
 
 @dataclass
 class Sub(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__sub__') and
-                (result := left_value.__sub__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rsub__') and
-                (result := right_value.__rsub__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for -: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '-'
 
 
 @dataclass
 class Mult(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__mul__') and
-                (result := left_value.__mul__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rmul__') and
-                (result := right_value.__rmul__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for *: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '*'
 
 
 @dataclass
 class Div(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__truediv__') and
-                (result := left_value.__truediv__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rtruediv__') and
-                (result := right_value.__rtruediv__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for /: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '/'
 
 
 @dataclass
 class FloorDiv(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__floordiv__') and
-                (result := left_value.__floordiv__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rfloordiv__') and
-                (result := right_value.__rfloordiv__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for //: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '//'
 
 
 @dataclass
 class Mod(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__mod__') and
-                (result := left_value.__mod__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rmod__') and
-                (result := right_value.__rmod__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for %: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '%'
 
 
 @dataclass
 class Pow(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__pow__') and
-                (result := left_value.__pow__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rpow__') and
-                (result := right_value.__rpow__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for **: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '**'
 
 
 @dataclass
 class LShift(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__lshift__') and
-                (result := left_value.__lshift__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rlshift__') and
-                (result := right_value.__rlshift__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for <<: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '<<'
 
 
 @dataclass
 class RShift(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__rshift__') and
-                (result := left_value.__rshift__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rrshift__') and
-                (result := right_value.__rrshift__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for >>: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '>>'
 
 
 @dataclass
 class BitAnd(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__and__') and
-                (result := left_value.__and__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rand__') and
-                (result := right_value.__rand__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for &: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '&'
 
 
 @dataclass
 class BitXor(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__xor__') and
-                (result := left_value.__xor__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__rxor__') and
-                (result := right_value.__rxor__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for ^: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '^'
 
 
 @dataclass
 class BitOr(Operator):
-    @classmethod
-    def eval(cls, left, right, /, *, env):
-        left_value = cls.process(left, env=env)
-        right_value = cls.process(right, env=env)
-
-        if (hasattr(left_value, '__or__') and
-                (result := left_value.__or__(right_value))
-                is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__ror__') and
-                (result := right_value.__ror__(left_value))
-              is not NotImplemented):
-            return result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"unsupported operand type(s) for |: "
-                  f"'{type(left_value).__name__}' and "
-                  f"'{type(right_value).__name__}'", line=True)
+    symbol = '|'
 
 
 @dataclass
 class UnaryOp(Ast):
+    _fields = ('op', 'operand')
     op: UnaryOperator
     operand: Ast
 
@@ -583,26 +550,26 @@ class UnaryOperator(Ast):
 class Invert(UnaryOperator):
     @staticmethod
     def eval(operand, /, *, env):
-        operand_value = operand.eval(env=env)
+        # the unboxed values are inverted like their wrapper types
+        operand_value = box(operand.eval(env=env))
 
         if hasattr(operand_value, '__invert__'):
-            return operand_value.__invert__()
+            try:
+                return env.model.convert(operand_value.__invert__())
+            except TypeError as err:
+                throw(operand.info, operand.token, 'TypeError', f'{err}',
+                      line=True)
         else:
             throw(operand.info, operand.token, 'TypeError',
                   f"bad operand type for unary ~: "
-                  f"'{type(operand_value).__name__}'", line=True)
+                  f"'{type_name(operand_value)}'", line=True)
 
 
 @dataclass
 class Not(UnaryOperator):
     @staticmethod
     def eval(operand, /, *, env):
-        operand_value = operand.eval(env=env)
-
-        if hasattr(operand_value, '__bool__'):
-            return ~BooleanType(operand_value)
-        else:
-            return BooleanType(False)
+        return env.model.false if operand.eval(env=env) else env.model.true
 
 
 @dataclass
@@ -616,7 +583,7 @@ class UAdd(UnaryOperator):
         else:
             throw(operand.info, operand.token, 'TypeError',
                   f"bad operand type for unary +: "
-                  f"'{type(operand_value).__name__}'", line=True)
+                  f"'{type_name(operand_value)}'", line=True)
 
 
 @dataclass
@@ -630,11 +597,12 @@ class USub(UnaryOperator):
         else:
             throw(operand.info, operand.token, 'TypeError',
                   f"bad operand type for unary -: "
-                  f"'{type(operand_value).__name__}'", line=True)
+                  f"'{type_name(operand_value)}'", line=True)
 
 
 @dataclass
 class InplaceUnaryOp(Ast):
+    _fields = ('source', 'target', 'op')
     source: Name
     target: Name
     op: InplaceUnaryOperator
@@ -645,95 +613,61 @@ class InplaceUnaryOp(Ast):
 
 @dataclass
 class InplaceUnaryOperator(Ast):
-    pass
+    symbol = None
+    op = None
+    post = None
+
+    @classmethod
+    def eval(cls, source, target, /, *, env):
+        source_value = source.eval(env=env)
+        one = env.model.one
+
+        try:
+            func = BINARY_DISPATCH[type(source_value), type(one), cls.op]
+        except KeyError:
+            func = binary_function(cls.op, source_value, one)
+
+        if func is None:
+            throw(source.info, source.token, 'TypeError',
+                  f"bad operand type for unary {cls.symbol}: "
+                  f"'{type_name(source_value)}'", line=True)
+
+        result = func(source_value, one)
+        env.values[target.slot] = result
+        return source_value if cls.post else result
 
 
 @dataclass
 class PostIncrement(InplaceUnaryOperator):
-    @staticmethod
-    def eval(source, target, /, *, env):
-        source_value = source.eval(env=env)
-        one = NumberType(1)
-
-        if (hasattr(source_value, '__add__') and
-                (result := source_value.__add__(one))
-                is not NotImplemented):
-            env[target.eval(env=env).id] = result
-            return source_value
-        elif (result := one.__radd__(source_value)) is not NotImplemented:
-            env[target.eval(env=env).id] = result
-            return source_value
-        else:
-            throw(source.info, source.token, 'TypeError',
-                  f"bad operand type for unary ++: "
-                  f"'{type(source_value).__name__}'", line=True)
+    symbol = '++'
+    op = '+'
+    post = True
 
 
 @dataclass
 class PostDecrement(InplaceUnaryOperator):
-    @staticmethod
-    def eval(source, target, /, *, env):
-        source_value = source.eval(env=env)
-        one = NumberType(1)
-
-        if (hasattr(source_value, '__sub__') and
-                (result := source_value.__sub__(one))
-                is not NotImplemented):
-            env[target.eval(env=env).id] = result
-            return source_value
-        elif (result := one.__rsub__(source_value)) is not NotImplemented:
-            env[target.eval(env=env).id] = result
-            return source_value
-        else:
-            throw(source.info, source.token, 'TypeError',
-                  f"bad operand type for unary --: "
-                  f"'{type(source_value).__name__}'", line=True)
+    symbol = '--'
+    op = '-'
+    post = True
 
 
 @dataclass
 class PreIncrement(InplaceUnaryOperator):
-    @staticmethod
-    def eval(source, target, /, *, env):
-        source_value = source.eval(env=env)
-        one = NumberType(1)
-
-        if (hasattr(source_value, '__add__') and
-                (result := source_value.__add__(one))
-                is not NotImplemented):
-            env[target.eval(env=env).id] = result
-            return result
-        elif (result := one.__radd__(source_value)) is not NotImplemented:
-            env[target.eval(env=env).id] = result
-            return result
-        else:
-            throw(source.info, source.token, 'TypeError',
-                  f"bad operand type for unary ++: "
-                  f"'{type(source_value).__name__}'", line=True)
+    symbol = '++'
+    op = '+'
+    post = False
 
 
 @dataclass
 class PreDecrement(InplaceUnaryOperator):
-    @staticmethod
-    def eval(source, target, /, *, env):
-        source_value = source.eval(env=env)
-        one = NumberType(1)
-
-        if (hasattr(source_value, '__sub__') and
-                (result := source_value.__sub__(one))
-                is not NotImplemented):
-            env[target.eval(env=env).id] = result
-            return result
-        elif (result := one.__rsub__(source_value)) is not NotImplemented:
-            env[target.eval(env=env).id] = result
-            return result
-        else:
-            throw(source.info, source.token, 'TypeError',
-                  f"bad operand type for unary --: "
-                  f"'{type(source_value).__name__}'", line=True)
+    symbol = '--'
+    op = '-'
+    post = False
 
 
 @dataclass
 class Compare(Ast):
+    _fields = ('left', 'ops', 'comparators')
     left: Ast
     ops: TypingList[CmpOp]
     comparators: TypingList[Ast]
@@ -741,93 +675,63 @@ class Compare(Ast):
     def eval(self, /, *, env):
         last = self.left
         for index in range(len(self.ops)):
-            if not self.ops[index].eval(
+            result = self.ops[index].eval(
                 last, self.comparators[index], env=env
-            ):
-                return BooleanType(False)
+            )
+
+            # element-wise comparisons of arrays give arrays
+            if type(result) is ArrayType and len(self.ops) == 1:
+                return result
+            elif not result:
+                return env.model.false
             last = self.comparators[index]
 
-        return BooleanType(True)
+        return env.model.true
 
 
 @dataclass
 class CmpOp(Ast):
-    pass
-
+    symbol = None
 
-@dataclass
-class Eq(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
+    @classmethod
+    def eval(cls, left, right, /, *, env):
         left_value = left.eval(env=env)
         right_value = right.eval(env=env)
 
-        if (hasattr(left_value, '__eq__') and (result := left_value.__eq__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__eq__') and (result := right_value.__eq__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__ne__') and (result := left_value.__ne__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__ne__') and (result := right_value.__ne__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
+        try:
+            func = COMPARE_DISPATCH[
+                type(left_value), type(right_value), cls.symbol
+            ]
+        except KeyError:
+            func = compare_function(cls.symbol, left_value, right_value)
+
+        if func is None:
+            if cls.symbol == '==':
+                return left_value is right_value
+            elif cls.symbol == '!=':
+                return left_value is not right_value
+
             throw(left.info, left.token, 'TypeError',
-                  f"'==' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+                  f"'{cls.symbol}' not supported between "
+                  f"'{type_name(left_value)}' "
+                  f"and '{type_name(right_value)}'")
+
+        return func(left_value, right_value)
 
 
 @dataclass
-class Gt(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
-        left_value = left.eval(env=env)
-        right_value = right.eval(env=env)
+class Eq(CmpOp):
+    symbol = '=='
 
-        if (hasattr(left_value, '__gt__') and (result := left_value.__gt__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__le__') and (result := right_value.__le__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__le__') and (result := left_value.__le__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__gt__') and (result := right_value.__gt__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"'>' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+
+@dataclass
+class Gt(CmpOp):
+    symbol = '>'
 
 
 @dataclass
 class GtE(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
-        left_value = left.eval(env=env)
-        right_value = right.eval(env=env)
-
-        if (hasattr(left_value, '__ge__') and (result := left_value.__ge__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__lt__') and (result := right_value.__lt__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__lt__') and (result := left_value.__lt__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__ge__') and (result := right_value.__ge__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"'>=' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+    symbol = '>='
 
 
 @dataclass
@@ -838,19 +742,21 @@ class In(CmpOp):
         right_value = right.eval(env=env)
 
         if hasattr(right_value, '__contains__'):
-            if isinstance(right_value, StringType):
-                if isinstance(left_value, StringType):
-                    return right_value.__contains__(left_value)
-                else:
-                    throw(left.info, left.token, 'TypeError',
-                          f"'in <StringType>' requires StringType "
-                          f"as left operand, not {type(left_value).__name__}",
-                          line=True)
-            else:
-                return right_value.__contains__(left_value)
+            if (isinstance(right_value, (StringType, str)) and
+                    not isinstance(left_value, (StringType, str))):
+                throw(left.info, left.token, 'TypeError',
+                      f"'in <StringType>' requires StringType "
+                      f"as left operand, not {type_name(left_value)}",
+                      line=True)
+
+            try:
+                return left_value in right_value
+            except TypeError as err:
+                throw(left.info, left.token, 'TypeError', f'{err}',
+                      line=True)
         else:
             throw(right.info, right.token, 'TypeError',
-                  f"argument of type '{type(right_value).__name__}' "
+                  f"argument of type '{type_name(right_value)}' "
                   f"is not iterable", line=True)
 
 
@@ -858,89 +764,29 @@ class In(CmpOp):
 class Is(CmpOp):
     @staticmethod
     def eval(left, right, /, *, env):
-        return BooleanType(left.eval(env=env) is right.eval(env=env))
+        return left.eval(env=env) is right.eval(env=env)
 
 
 @dataclass
 class IsNot(CmpOp):
     @staticmethod
     def eval(left, right, /, *, env):
-        return BooleanType(left.eval(env=env) is not right.eval(env=env))
+        return left.eval(env=env) is not right.eval(env=env)
 
 
 @dataclass
 class Lt(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
-        left_value = left.eval(env=env)
-        right_value = right.eval(env=env)
-
-        if (hasattr(left_value, '__lt__') and (result := left_value.__lt__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__ge__') and (result := right_value.__ge__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__ge__') and (result := left_value.__ge__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__lt__') and (result := right_value.__lt__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"'<' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+    symbol = '<'
 
 
 @dataclass
 class LtE(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
-        left_value = left.eval(env=env)
-        right_value = right.eval(env=env)
-
-        if (hasattr(left_value, '__le__') and (result := left_value.__le__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__gt__') and (result := right_value.__gt__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__gt__') and (result := left_value.__gt__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__le__') and (result := right_value.__le__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"'<=' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+    symbol = '<='
 
 
 @dataclass
 class NotEq(CmpOp):
-    @staticmethod
-    def eval(left, right, /, *, env):
-        left_value = left.eval(env=env)
-        right_value = right.eval(env=env)
-
-        if (hasattr(left_value, '__ne__') and (result := left_value.__ne__(
-                right_value)) is not NotImplemented):
-            return result
-        elif (hasattr(right_value, '__ne__') and (result := right_value.__ne__(
-                left_value)) is not NotImplemented):
-            return result
-        elif (hasattr(left_value, '__eq__') and (result := left_value.__eq__(
-                right_value)) is not NotImplemented):
-            return ~result
-        elif (hasattr(right_value, '__eq__') and (result := right_value.__eq__(
-                left_value)) is not NotImplemented):
-            return ~result
-        else:
-            throw(left.info, left.token, 'TypeError',
-                  f"'!=' not supported between '{type(left_value).__name__}' "
-                  f"and '{type(right_value).__name__}'")
+    symbol = '!='
 
 
 @dataclass
@@ -951,19 +797,21 @@ class NotIn(CmpOp):
         right_value = right.eval(env=env)
 
         if hasattr(right_value, '__contains__'):
-            if isinstance(right_value, StringType):
-                if isinstance(left_value, StringType):
-                    return ~right_value.__contains__(left_value)
-                else:
-                    throw(left.info, left.token, 'TypeError',
-                          f"'not in <StringType>' requires StringType "
-                          f"as left operand, not {type(left_value).__name__}",
-                          line=True)
-            else:
-                return ~right_value.__contains__(left_value)
+            if (isinstance(right_value, (StringType, str)) and
+                    not isinstance(left_value, (StringType, str))):
+                throw(left.info, left.token, 'TypeError',
+                      f"'not in <StringType>' requires StringType "
+                      f"as left operand, not {type_name(left_value)}",
+                      line=True)
+
+            try:
+                return left_value not in right_value
+            except TypeError as err:
+                throw(left.info, left.token, 'TypeError', f'{err}',
+                      line=True)
         else:
             throw(right.info, right.token, 'TypeError',
-                  f"argument of type '{type(right_value).__name__}' "
+                  f"argument of type '{type_name(right_value)}' "
                   f"is not iterable", line=True)
 
 
@@ -979,26 +827,40 @@ class GetItem(Ast):
         obj = self.obj.eval(env=env)
         key = self.key.eval(env=env)
 
-        if hasattr(obj, '__getitem__'):
+        if type(obj) is DictType:
+            try:
+                return obj[key]
+            except KeyError:
+                throw(self.key.info, self.key.token, 'KeyError',
+                      represent(key), line=True)
+            except TypeError as err:
+                throw(self.key.info, self.key.token, 'TypeError', f'{err}',
+                      line=True)
+        elif hasattr(obj, '__getitem__'):
             if isinstance(key, NumberType):
-                if key.value % 1 != 0:
-                    throw(self.key.info, self.key.token, 'TypeError',
-                          f'{type(obj).__name__} indices must '
-                          f'be integers or slices, not float', line=True)
-                if key.value >= len(obj):
-                    throw(self.key.info, self.key.token, 'IndexError',
-                          f'{type(obj).__name__} index out of range', line=True)
-                return obj[int(key.value)]
+                index = _whole(key.value)
+            elif type(key) is int or type(key) is float:
+                index = _whole(key)
             elif isinstance(key, SliceType):
-                return obj[key]
+                return obj[slice(key.start, key.stop, key.step)]
             else:
                 throw(self.key.info, self.key.token, 'TypeError',
-                      f'{type(obj).__name__} indices must '
-                      f'be integers or slices, not {type(key).__name__}',
+                      f'{type_name(obj)} indices must '
+                      f'be integers or slices, not {type_name(key)}',
                       line=True)
+
+            try:
+                return obj[index]
+            except IndexError:
+                throw(self.key.info, self.key.token, 'IndexError',
+                      f'{type_name(obj)} index out of range', line=True)
+            except TypeError:
+                throw(self.key.info, self.key.token, 'TypeError',
+                      f'{type_name(obj)} indices must '
+                      f'be integers or slices, not float', line=True)
         else:
             throw(self.obj.info, self.obj.token, 'TypeError',
-                  f"'{type(obj).__name__}' object is not subscriptable",
+                  f"'{type_name(obj)}' object is not subscriptable",
                   line=True)
 
 
@@ -1008,16 +870,16 @@ class If(Ast):
     test: Ast
     body: TypingList[Ast]
     orelse: TypingList[Ast] = field(default_factory=list)
+    jumps = True
 
     def eval(self, /, *, env):
-        for stmt in self.body if self.test.eval(env=env) else self.orelse:
-            if isinstance(stmt, ScopeStmt):
-                return stmt
+        body = self.body if self.test.eval(env=env) else self.orelse
 
-            result = stmt.eval(env=env)
+        if self.jumps:
+            return _run(body, env)
 
-            if isinstance(result, ScopeStmt):
-                return result
+        for stmt in body:
+            stmt.eval(env=env)
 
 
 @dataclass
@@ -1028,32 +890,78 @@ class For(Ast):
     loop: Ast
     body: TypingList[Ast]
     orelse: TypingList[Ast] = field(default_factory=list)
+    jumps = True
+    step = None
 
     def eval(self, /, *, env):
-        self.init.eval(env=env)
+        cond, loop, body = self.cond, self.loop, self.body
+        start = self.init.eval(env=env)
+
+        if self.step is not None:
+            counter = self.counter(start, env=env)
+            if counter is not None:
+                return self.eval_counted(counter, env=env)
+
+        if self.jumps:
+            while cond.eval(env=env):
+                for stmt in body:
+                    if (status := stmt.eval(env=env)) is BREAK:
+                        return
+                    elif status is CONTINUE:
+                        break
+                    elif status is RETURN:
+                        return status
 
-        while self.cond.eval(env=env):
-            for stmt in self.body:
-                if isinstance(stmt, Break):
-                    return
-                elif isinstance(stmt, Continue):
-                    break
+                loop.eval(env=env)
+        else:
+            while cond.eval(env=env):
+                for stmt in body:
+                    stmt.eval(env=env)
 
-                result = stmt.eval(env=env)
+                loop.eval(env=env)
 
-                if isinstance(result, Exit):
-                    return stmt
+        return _run(self.orelse, env)
 
-            self.loop.eval(env=env)
+    def counter(self, start, /, *, env):
+        # the range of the counter of a counted loop, or None if its bounds
+        # aren't integers
+        start = unbox(start)
+        stop = unbox(self.cond.comparators[0].eval(env=env))
 
-        for stmt in self.orelse:
-            if isinstance(stmt, ScopeStmt):
-                return stmt
+        if type(start) is not int or type(stop) is not int:
+            return None
 
-            result = stmt.eval(env=env)
+        op = type(self.cond.ops[0])
+        if op is LtE:
+            stop += 1
+        elif op is GtE:
+            stop -= 1
 
-            if isinstance(result, ScopeStmt):
-                return result
+        return range(start, stop, self.step)
+
+    def eval_counted(self, counter, /, *, env):
+        values, slot, body = env.values, self.init.target.slot, self.body
+        numbers = env.model.numbers(counter)
+
+        if self.jumps:
+            for values[slot] in numbers:
+                for stmt in body:
+                    if (status := stmt.eval(env=env)) is BREAK:
+                        return
+                    elif status is CONTINUE:
+                        break
+                    elif status is RETURN:
+                        return status
+        else:
+            for values[slot] in numbers:
+                for stmt in body:
+                    stmt.eval(env=env)
+
+        # the value that failed the condition
+        values[slot] = env.model.convert(
+            counter.start + len(counter) * counter.step
+        )
+        return _run(self.orelse, env)
 
 
 @dataclass
@@ -1063,43 +971,32 @@ class ForOf(Ast):
     source: Ast
     body: TypingList[Ast]
     orelse: TypingList[Ast] = field(default_factory=list)
+    jumps = True
 
     def eval(self, /, *, env):
         value = self.source.eval(env=env)
-        target_value = self.target.eval(env=env)
+        values, slot, body = env.values, self.target.slot, self.body
 
         if not hasattr(value, '__iter__'):
-            throw(source.info, source.token, 'TypeError',
-                  f"'{type(value).__name__}' object is not iterable",
+            throw(self.source.info, self.source.token, 'TypeError',
+                  f"'{type_name(value)}' object is not iterable",
                   line=True)
 
-        iterator = iter(value)
-
-        try:
-            while True:
-                env[target_value.id] = next(iterator)
-
-                for stmt in self.body:
-                    if isinstance(stmt, Break):
+        if self.jumps:
+            for values[slot] in value:
+                for stmt in body:
+                    if (status := stmt.eval(env=env)) is BREAK:
                         return
-                    elif isinstance(stmt, Continue):
+                    elif status is CONTINUE:
                         break
+                    elif status is RETURN:
+                        return status
+        else:
+            for values[slot] in value:
+                for stmt in body:
+                    stmt.eval(env=env)
 
-                    result = stmt.eval(env=env)
-
-                    if isinstance(result, Exit):
-                        return stmt
-        except StopIteration:
-            pass
-
-        for stmt in self.orelse:
-            if isinstance(stmt, ScopeStmt):
-                return stmt
-
-            result = stmt.eval(env=env)
-
-            if isinstance(result, ScopeStmt):
-                return result
+        return _run(self.orelse, env)
 
 
 @dataclass
@@ -1108,30 +1005,26 @@ class While(Ast):
     test: Ast
     body: TypingList[Ast]
     orelse: TypingList[Ast] = field(default_factory=list)
+    jumps = True
 
     def eval(self, /, *, env):
-        run_orelse = True
+        test, body = self.test, self.body
 
-        while self.test.eval(env=env):
-            for stmt in self.body:
-                if isinstance(stmt, Break):
-                    return
-                elif isinstance(stmt, Continue):
-                    break
-
-                result = stmt.eval(env=env)
-
-                if isinstance(result, Exit):
-                    return stmt
-
-        for stmt in self.orelse:
-            if isinstance(stmt, ScopeStmt):
-                return stmt
-
-            result = stmt.eval(env=env)
+        if self.jumps:
+            while test.eval(env=env):
+                for stmt in body:
+                    if (status := stmt.eval(env=env)) is BREAK:
+                        return
+                    elif status is CONTINUE:
+                        break
+                    elif status is RETURN:
+                        return status
+        else:
+            while test.eval(env=env):
+                for stmt in body:
+                    stmt.eval(env=env)
 
-            if isinstance(result, ScopeStmt):
-                return result
+        return _run(self.orelse, env)
 
 
 @dataclass
@@ -1145,12 +1038,14 @@ class ScopeStmt(Ast):
 
 @dataclass
 class Break(ScopeStmt):
-    pass
+    def eval(self, /, *, env):
+        return BREAK
 
 
 @dataclass
 class Continue(ScopeStmt):
-    pass
+    def eval(self, /, *, env):
+        return CONTINUE
 
 
 @dataclass
@@ -1159,9 +1054,23 @@ class FunctionDef(Ast):
     name: str
     args: Arguments = field(default_factory=Arguments)
     body: list = field(default_factory=list)
+    slot = None
+    binding = None
+    memo = None
+    reads = ()
 
     def eval(self, /, *, env):
-        env[self.name] = FunctionType(self.name, self.args, self.body)
+        args = self.args
+        defaults = [UNBOUND if default is None else default.eval(env=env)
+                    for default in args.defaults]
+        kw_defaults = [UNBOUND if default is None else default.eval(env=env)
+                       for default in args.kw_defaults]
+
+        env.values[self.slot] = FunctionType(
+            self.name, self.binding, self.body, defaults, kw_defaults,
+            env.globals, env.model,
+            memo=None if self.memo is None else Memo(self.memo, self.reads),
+        )
 
 
 @dataclass
@@ -1172,8 +1081,152 @@ class Call(Ast):
     kwargs: TypingDict[str, Ast]
 
     def eval(self, /, *, env):
+        return call(*self.arguments(env=env), env=env, node=self)
+
+    def arguments(self, /, *, env):
+        # the function called, and the values of the arguments
         func = self.name.eval(env=env)
 
+        if (type(func) is not FunctionType and
+                type(func) is not BuiltinFunctionType):
+            throw(self.name.info, self.name.token, 'TypeError',
+                  f"'{type_name(func)}' object is not callable", line=True)
+
+        args = [arg.eval(env=env) for arg in self.args]
+        if self.kwargs:
+            kwargs = {name: value.eval(env=env)
+                      for name, value in self.kwargs.items()}
+        else:
+            kwargs = {}
+
+        return func, args, kwargs
+
+
+@dataclass
+class Value(Ast):
+    # an argument evaluated already, of a call to a builtin function used
+    # as a value, with the place of the call for the errors
+    _fields = ('value',)
+    value: object
+
+    def __init__(self, value, node, /):
+        self.value = value
+        self.info = node.info
+        self.token = node.token
+
+    def eval(self, /, *, env):
+        return self.value
+
+
+def call(func, args, kwargs, /, *, env, node):
+    # calls a function or a builtin function, reporting its errors at `node`
+    if type(func) is FunctionType:
+        return invoke(func, args, kwargs, node=node)
+
+    for name in kwargs:
+        if name not in func.keywords:
+            throw(node.info, node.token, 'TypeError',
+                  f"{func.name}() got an unexpected keyword argument "
+                  f"'{name}'", line=True)
+
+    result = func.node([Value(arg, node) for arg in args],
+                       {name: Value(value, node)
+                        for name, value in kwargs.items()})
+    result.info, result.token = node.info, node.token
+    return result.eval(env=env)
+
+
+def caller(func, arity, /, *, env, node):
+    # a Python function calling `function` with `arity` arguments, for the
+    # builtins calling it for every item
+    if type(func) is FunctionType:
+        def function_caller(*args):
+            return invoke(func, args, {}, node=node)
+        return function_caller
+
+    holders = [Value(none, node) for _ in range(arity)]
+    result = func.node(holders, {})
+    result.info, result.token = node.info, node.token
+
+    if arity == 1:
+        holder, = holders
+
+        def builtin_caller(arg, /):
+            holder.value = arg
+            return result.eval(env=env)
+    else:
+        def builtin_caller(*args):
+            for holder, arg in zip(holders, args):
+                holder.value = arg
+            return result.eval(env=env)
+
+    return builtin_caller
+
+
+def invoke(func, args, kwargs, /, *, node):
+    # runs the function, through its cache if it is `memo`
+    memo = func.memo
+    if memo is None:
+        return _run_function(func, args, kwargs, node)
+
+    memo.validate(func.globals)
+    try:
+        key = memo.key(args, kwargs)
+    except TypeError as err:
+        throw(node.info, node.token, 'TypeError', f'{err}', line=True)
+
+    if (result := memo.lookup(key)) is UNBOUND:
+        result = _run_function(func, args, kwargs, node)
+        memo.store(key, result)
+
+    return result
+
+
+def _run_function(func, args, kwargs, node, /):
+    # the tail calls run in this loop instead of nested calls, except the
+    # ones of `memo` and builtin functions, whose results are kept
+    while True:
+        # the frames are taken from the pool of the function after the
+        # arguments are evaluated, as they may call the function as well
+        binding, pool = func.binding, func.pool
+        if pool:
+            frame = pool.pop()
+        else:
+            frame = Frame(binding.slots, func.model, func.globals)
+        values = frame.values
+
+        try:
+            if (binding.plain and not kwargs and
+                    len(args) == binding.positional):
+                values[:len(args)] = args
+            else:
+                try:
+                    binding.bind(values, args, kwargs, func.defaults,
+                                 func.kw_defaults, func.model)
+                except TypeError as err:
+                    throw(node.info, node.token, 'TypeError', f'{err}',
+                          line=True)
+
+            for stmt in func.body:
+                if stmt.eval(env=frame) is RETURN:
+                    break
+            else:
+                return none
+
+            if frame.call is None:
+                return frame.result
+
+            node, func, args, kwargs = frame.call
+            if type(func) is not FunctionType or func.memo is not None:
+                return call(func, args, kwargs, env=frame, node=node)
+        except RecursionError:
+            throw(node.info, node.token, 'RecursionError',
+                  'maximum recursion depth exceeded', line=True)
+        finally:
+            values[:] = binding.blank
+            frame.result = frame.call = None
+            pool.append(frame)
+
 
 @dataclass
 class FunctionStmt(Ast):
@@ -1191,6 +1244,19 @@ class Global(FunctionStmt):
 class Return(FunctionStmt):
     _fields = ('value',)
     value: Ast
+    tail = False
+
+    def eval(self, /, *, env):
+        if self.tail:
+            # the resolver marks the returns of calls, which are left to the
+            # call of the function that returns
+            env.call = (self.value, *self.value.arguments(env=env))
+        elif self.value is None:
+            env.result = none
+        else:
+            env.result = self.value.eval(env=env)
+
+        return RETURN
 
 
 @dataclass
@@ -1251,12 +1317,6 @@ class Arguments(Ast):
         self.kwarg = kwarg
         self.defaults = [] if defaults is None else defaults
 
-        argument_ids = {*()}
-
-        for arg in self.posonlyargs + self.args + self.kwonlyargs:
-            if arg in argument_ids:
-                throw()
-
     def eval(self, /, *, env):
         return ArgumentsType(
             self.posonlyargs, self.args, self.vararg, self.kwonlyargs,
@@ -1266,12 +1326,41 @@ class Arguments(Ast):
 
 @dataclass
 class BuiltinFunction(Ast):
-    _fields = ('args',)
+    _fields = ('args', 'kwargs')
     args: TypingTuple[Ast] = field(default_factory=list)
+    kwargs: TypingDict[str, Ast] = field(default_factory=dict)
+    # the names of the keyword arguments it takes
+    keywords = ()
+
+
+def _iterable(node, /, *, env):
+    # the value of an argument that must be iterable
+    value = node.eval(env=env)
+
+    if not hasattr(value, '__iter__'):
+        throw(node.info, node.token, 'TypeError',
+              f"'{type_name(value)}' object is not iterable", line=True)
+
+    return value
+
+
+def _function(node, /, *, env, optional=False):
+    # the value of an argument that must be callable, or None for none if
+    # it is optional
+    value = node.eval(env=env)
+
+    if optional and value is none:
+        return None
+    elif (type(value) is not FunctionType and
+            type(value) is not BuiltinFunctionType):
+        throw(node.info, node.token, 'TypeError',
+              f"'{type_name(value)}' object is not callable", line=True)
+
+    return value
 
 
 @dataclass
-class Exit(BuiltinFunction, ScopeStmt):
+class Exit(BuiltinFunction):
     def eval(self, /, *, env):
         if len(self.args) > 1:
             throw(self.args[0].info, self.args[0].token, 'TypeError',
@@ -1279,9 +1368,9 @@ class Exit(BuiltinFunction, ScopeStmt):
                   line=True)
 
         if self.args:
-            print(self.args[0].eval(env=env))
+            output.sink.write(f'{display(self.args[0].eval(env=env))}\n')
 
-        return self
+        raise _ProgramExit
 
 
 @dataclass
@@ -1292,8 +1381,40 @@ class Input(BuiltinFunction):
                   f'input excepted at most 1 argument, got {len(self.args)}',
                   line=True)
 
-        return StringType(input() if not self.args
-                          else input(self.args[0].eval(env=env)))
+        prompt = '' if not self.args else display(self.args[0].eval(env=env))
+
+        # the output so far is shown before the input is read
+        output.sink.flush()
+        return env.model.convert(input(prompt))
+
+
+@dataclass
+class Lines(BuiltinFunction):
+    keywords = ('mmap',)
+
+    def eval(self, /, *, env):
+        if len(self.args) > 1:
+            throw(self.info, self.token, 'TypeError',
+                  f'lines excepted at most 1 argument, got {len(self.args)}',
+                  line=True)
+
+        path = None
+        if self.args:
+            path = unbox(self.args[0].eval(env=env))
+            if type(path) is not str:
+                throw(self.args[0].info, self.args[0].token, 'TypeError',
+                      'the path must be a StringType', line=True)
+
+        mapped = ('mmap' in self.kwargs and
+                  bool(self.kwargs['mmap'].eval(env=env)))
+
+        try:
+            lines = read_lines(path, mapped=mapped)
+        except OSError as err:
+            throw(self.info, self.token, type(err).__name__, f'{err}',
+                  line=True)
+
+        return IteratorType(map(env.model.convert, lines), 'lines')
 
 
 @dataclass
@@ -1307,49 +1428,371 @@ class Length(BuiltinFunction):
         value = self.args[0].eval(env=env)
 
         if hasattr(value, '__len__'):
-            return NumberType(len(value))
+            return env.model.convert(len(value))
         else:
             throw(self.args[0].info, self.args[0].token, 'TypeError',
-                  f'object of type {type(value).__name__} has no length()',
+                  f'object of type {type_name(value)} has no length()',
                   line=True)
 
 
 @dataclass
-class Match(BuiltinFunction):
+class RegexFunction(BuiltinFunction):
+    name = None
+
     def eval(self, /, *, env):
         if len(self.args) != 2:
-            throw(self.args[0].info, self.args[0].token, 'TypeError',
-                  f'match excepted exactly 2 arguments, got {len(self.args)}',
-                  line=True)
+            throw(self.info, self.token, 'TypeError',
+                  f'{self.name} excepted exactly 2 arguments, '
+                  f'got {len(self.args)}', line=True)
 
         pattern, string = self.args
-        pattern_value = pattern.eval(env=env)
-        string_value = string.eval(env=env)
+        pattern_value = unbox(pattern.eval(env=env))
+        string_value = unbox(string.eval(env=env))
 
-        if not isinstance(pattern_value, StringType):
+        if (type(pattern_value) is not str and
+                type(pattern_value) is not RegexType):
             throw(pattern.info, pattern.token, 'TypeError',
-                  'the pattern must be a StringType', line=True)
+                  'the pattern must be a StringType or a RegexType',
+                  line=True)
 
-        if not isinstance(string_value, StringType):
+        if type(string_value) is not str:
             throw(string.info, string.token, 'TypeError',
                   'the string must be a StringType', line=True)
 
+        if type(pattern_value) is RegexType:
+            return self.apply(pattern_value.pattern, string_value, env=env)
+
         try:
-            pattern_obj = re_compile(pattern_value.value)
+            pattern_obj = compile_pattern(pattern_value)
         except re_error as err:
             throw(pattern.info, pattern.token, 'RegexError',
                   f'{err}', line=True)
 
-        return bool(re_match(pattern_obj, string_value.value))
+        return self.apply(pattern_obj, string_value, env=env)
+
+
+@dataclass
+class Match(RegexFunction):
+    name = 'match'
+
+    def apply(self, pattern, string, /, *, env):
+        return env.model.true if pattern.match(string) else env.model.false
+
+
+@dataclass
+class Search(RegexFunction):
+    name = 'search'
+
+    def apply(self, pattern, string, /, *, env):
+        result = pattern.search(string)
+        return none if result is None else env.model.convert(result.group())
+
+
+@dataclass
+class FindAll(RegexFunction):
+    name = 'findall'
+
+    def apply(self, pattern, string, /, *, env):
+        convert = env.model.convert
+        if pattern.groups > 1:
+            return ListType([TupleType(tuple(map(convert, groups)))
+                             for groups in pattern.findall(string)])
+        else:
+            return ListType([*map(convert, pattern.findall(string))])
+
+
+@dataclass
+class FindIter(RegexFunction):
+    name = 'finditer'
+
+    def apply(self, pattern, string, /, *, env):
+        convert = env.model.convert
+        return IteratorType(
+            (convert(result.group()) for result in pattern.finditer(string)),
+            'finditer',
+        )
+
+
+@dataclass
+class Reduction(BuiltinFunction):
+    name = None
+
+    def eval(self, /, *, env):
+        if len(self.args) != 1:
+            throw(self.info, self.token, 'TypeError',
+                  f'{self.name} excepted exactly 1 argument, '
+                  f'got {len(self.args)}', line=True)
+
+        value = self.args[0].eval(env=env)
+
+        if not hasattr(value, '__iter__'):
+            throw(self.args[0].info, self.args[0].token, 'TypeError',
+                  f"'{type_name(value)}' object is not iterable", line=True)
+
+        try:
+            return env.model.convert(reduction(self.name, value))
+        except (TypeError, ValueError) as err:
+            throw(self.args[0].info, self.args[0].token, type(err).__name__,
+                  f'{err}', line=True)
+
+
+@dataclass
+class Sum(Reduction):
+    name = 'sum'
+
+
+@dataclass
+class Min(Reduction):
+    name = 'min'
+
+
+@dataclass
+class Max(Reduction):
+    name = 'max'
+
+
+@dataclass
+class Mean(Reduction):
+    name = 'mean'
+
+
+@dataclass
+class Sorted(BuiltinFunction):
+    keywords = ('key', 'reverse')
+
+    def eval(self, /, *, env):
+        if len(self.args) != 1:
+            throw(self.info, self.token, 'TypeError',
+                  f'sorted excepted exactly 1 argument, got {len(self.args)}',
+                  line=True)
+
+        values = _iterable(self.args[0], env=env)
+
+        # the values are compared unboxed, as the Python values they wrap
+        key = None if not env.model.boxed else unbox
+        if 'key' in self.kwargs and (func := _function(
+                self.kwargs['key'], env=env, optional=True)) is not None:
+            key_caller = caller(func, 1, env=env, node=self)
+
+            def key(value, /):
+                return unbox(key_caller(value))
+
+        reverse = ('reverse' in self.kwargs and
+                   bool(self.kwargs['reverse'].eval(env=env)))
+
+        try:
+            return ListType(sorted(values, key=key, reverse=reverse))
+        except TypeError as err:
+            throw(self.info, self.token, 'TypeError', f'{err}', line=True)
+
+
+@dataclass
+class Reverse(BuiltinFunction):
+    def eval(self, /, *, env):
+        if len(self.args) != 1:
+            throw(self.info, self.token, 'TypeError',
+                  f'reverse excepted exactly 1 argument, '
+                  f'got {len(self.args)}', line=True)
+
+        value = self.args[0].eval(env=env)
+
+        # the slices of the sequences are views of them when they are long
+        if isinstance(value, (str, StringType, TupleType, ListType,
+                              ArrayType, RangeType)):
+            return env.model.convert(value[::-1])
+        else:
+            throw(self.args[0].info, self.args[0].token, 'TypeError',
+                  f"'{type_name(value)}' object is not reversible",
+                  line=True)
+
+
+@dataclass
+class Join(BuiltinFunction):
+    def eval(self, /, *, env):
+        if not 1 <= len(self.args) <= 2:
+            throw(self.info, self.token, 'TypeError',
+                  f'join excepted 1 to 2 arguments, got {len(self.args)}',
+                  line=True)
+
+        strings = [*map(unbox, _iterable(self.args[0], env=env))]
+
+        if len(self.args) == 1:
+            separator = ''
+        elif type(separator := unbox(self.args[1].eval(env=env))) is not str:
+            throw(self.args[1].info, self.args[1].token, 'TypeError',
+                  'the separator must be a StringType', line=True)
+
+        try:
+            return env.model.convert(separator.join(strings))
+        except TypeError:
+            for index, string in enumerate(strings):
+                if type(string) is not str:
+                    throw(self.args[0].info, self.args[0].token, 'TypeError',
+                          f'sequence item {index}: expected StringType, '
+                          f'not {type_name(string)}', line=True)
+
+
+@dataclass
+class Split(BuiltinFunction):
+    def eval(self, /, *, env):
+        if not 1 <= len(self.args) <= 3:
+            throw(self.info, self.token, 'TypeError',
+                  f'split excepted 1 to 3 arguments, got {len(self.args)}',
+                  line=True)
+
+        string, *options = self.args
+        string_value = unbox(string.eval(env=env))
+        separator, maxsplit = None, -1
+
+        if type(string_value) is not str:
+            throw(string.info, string.token, 'TypeError',
+                  'the string must be a StringType', line=True)
+
+        if options:
+            separator = unbox(options[0].eval(env=env))
+            if separator is none:
+                separator = None
+            elif type(separator) is not str:
+                throw(options[0].info, options[0].token, 'TypeError',
+                      'the separator must be a StringType or none',
+                      line=True)
+
+        if len(options) == 2:
+            maxsplit = unbox(options[1].eval(env=env))
+            if type(maxsplit) is not int:
+                throw(options[1].info, options[1].token, 'TypeError',
+                      f'maxsplit must be an integer, '
+                      f'not {type_name(maxsplit)}', line=True)
+
+        try:
+            parts = string_value.split(separator, maxsplit)
+        except ValueError as err:
+            throw(options[0].info, options[0].token, 'ValueError',
+                  f'{err}', line=True)
+
+        return ListType([*map(env.model.convert, parts)])
+
+
+@dataclass
+class Map(BuiltinFunction):
+    def eval(self, /, *, env):
+        if len(self.args) < 2:
+            throw(self.info, self.token, 'TypeError',
+                  f'map excepted at least 2 arguments, got {len(self.args)}',
+                  line=True)
+
+        func = _function(self.args[0], env=env)
+        iterables = [_iterable(arg, env=env) for arg in self.args[1:]]
+
+        return IteratorType(
+            map(caller(func, len(iterables), env=env, node=self),
+                *iterables),
+            'map',
+        )
+
+
+@dataclass
+class Filter(BuiltinFunction):
+    def eval(self, /, *, env):
+        if len(self.args) != 2:
+            throw(self.info, self.token, 'TypeError',
+                  f'filter excepted exactly 2 arguments, '
+                  f'got {len(self.args)}', line=True)
+
+        # the values themselves are tested if the function is none
+        func = _function(self.args[0], env=env, optional=True)
+        if func is not None:
+            func = caller(func, 1, env=env, node=self)
+
+        return IteratorType(filter(func, _iterable(self.args[1], env=env)),
+                            'filter')
+
+
+@dataclass
+class Reduce(BuiltinFunction):
+    def eval(self, /, *, env):
+        if not 2 <= len(self.args) <= 3:
+            throw(self.info, self.token, 'TypeError',
+                  f'reduce excepted 2 to 3 arguments, got {len(self.args)}',
+                  line=True)
+
+        func = caller(_function(self.args[0], env=env), 2, env=env,
+                      node=self)
+        values = _iterable(self.args[1], env=env)
+
+        if len(self.args) == 3:
+            return reduce(func, values, self.args[2].eval(env=env))
+
+        try:
+            return reduce(func, values)
+        except TypeError as err:
+            throw(self.info, self.token, 'TypeError', f'{err}', line=True)
+
+
+@dataclass
+class MemoInfo(BuiltinFunction):
+    def eval(self, /, *, env):
+        if len(self.args) != 1:
+            throw(self.info, self.token, 'TypeError',
+                  f'memo_info excepted exactly 1 argument, '
+                  f'got {len(self.args)}', line=True)
+
+        func = self.args[0].eval(env=env)
+
+        if type(func) is not FunctionType or func.memo is None:
+            throw(self.args[0].info, self.args[0].token, 'TypeError',
+                  f"'{type_name(func)}' object is not a memo function",
+                  line=True)
+
+        memo = func.memo
+        return DictType({
+            'hits': env.model.convert(memo.hits),
+            'misses': env.model.convert(memo.misses),
+            'size': env.model.convert(len(memo.entries)),
+            'maxsize': env.model.convert(memo.maxsize),
+        }, env.model)
 
 
 @dataclass
 class Print(BuiltinFunction):
     def eval(self, /, *, env):
-        print(' '.join(f'{value.eval(env=env)}' for value in self.args))
+        if len(self.args) == 1:
+            text = display(self.args[0].eval(env=env))
+        else:
+            text = ' '.join([display(value.eval(env=env))
+                             for value in self.args])
+
+        output.sink.write(f'{text}\n')
         return none
 
 
+@dataclass
+class Range(BuiltinFunction):
+    def eval(self, /, *, env):
+        if not 1 <= len(self.args) <= 3:
+            throw(self.info, self.token, 'TypeError',
+                  f'range excepted 1 to 3 arguments, got {len(self.args)}',
+                  line=True)
+
+        bounds = []
+        for arg in self.args:
+            value = _whole(unbox(arg.eval(env=env)))
+
+            if type(value) is not int:
+                kind = 'float' if type(value) is float else type_name(value)
+                throw(arg.info, arg.token, 'TypeError',
+                      f'range arguments must be integers, not {kind}',
+                      line=True)
+
+            bounds.append(value)
+
+        if len(bounds) == 3 and bounds[2] == 0:
+            throw(self.args[2].info, self.args[2].token, 'ValueError',
+                  'range step must not be zero', line=True)
+
+        return RangeType(range(*bounds), env.model)
+
+
 @dataclass
 class Repr(BuiltinFunction):
     def eval(self, /, *, env):
@@ -1358,15 +1801,49 @@ class Repr(BuiltinFunction):
                   f'repr excepted at most 1 argument, got {len(self.args)}',
                   line=True)
 
-        return StringType(f'{self.args[0].eval(env=env)!r}')
+        return env.model.convert(represent(self.args[0].eval(env=env)))
 
 
 BUILTIN_FUNCTIONS = {
     'exit': Exit,
+    'filter': Filter,
+    'findall': FindAll,
+    'finditer': FindIter,
     'input': Input,
+    'join': Join,
     'length': Length,
+    'lines': Lines,
+    'map': Map,
     'match': Match,
+    'max': Max,
+    'mean': Mean,
+    'memo_info': MemoInfo,
+    'min': Min,
     'quit': Exit,
     'print': Print,
+    'range': Range,
+    'reduce': Reduce,
     'repr': Repr,
+    'reverse': Reverse,
+    'search': Search,
+    'sorted': Sorted,
+    'split': Split,
+    'sum': Sum,
 }
+
+
+def _constructor(cls, /):
+    def node(args, kwargs, /):
+        return Construct(cls, args)
+    return node
+
+
+# the builtin functions and the constructors are values as well, of the
+# variables of their names, which can be passed to the functions calling
+# them in bulk or called by other names
+DEFAULT_ENV.update(
+    {name: BuiltinFunctionType(name, node, keywords=node.keywords)
+     for name, node in BUILTIN_FUNCTIONS.items()},
+    **{name: BuiltinFunctionType(name, _constructor(cls))
+       for name, cls in CONSTRUCTOR_TYPES.items()},
+)
@@ -0,0 +1,249 @@
+from collections import deque
+import gc
+from json import dumps, loads
+import os
+from selectors import EVENT_READ, DefaultSelector
+import signal
+import sys
+from time import perf_counter
+from typing import Iterable, Iterator, List, Optional
+
+from .interpreter import Interpreter
+from .server import Server
+
+
+__all__ = ['WorkerPool', 'percentile', 'batch_report']
+
+
+# the phases of the jobs reported, the ones of `Server` and the time from
+# sending the job to a worker to getting its result
+PHASES = ('parse', 'run', 'total')
+
+
+class _Worker:
+    __slots__ = ('pid', 'jobs', 'results', 'job', 'started')
+
+    def __init__(self, pid: int, jobs, results, /) -> None:
+        self.pid = pid
+        self.jobs = jobs
+        self.results = results
+        # the job running, with the time it was sent at
+        self.job = None
+        self.started = 0.0
+
+
+def _serve_jobs(server: Server, jobs, results, /) -> None:
+    # the loop of a worker, which runs the jobs until the pool closes
+    for line in jobs:
+        job = loads(line)
+        result = server.handle({'path': job['path']})
+        result.update(job)
+        results.write(f'{dumps(result)}\n')
+        results.flush()
+
+
+class WorkerPool:
+    # forked workers sharing the parser of `interpreter`, which are killed and
+    # replaced when a job runs longer than `timeout`
+    def __init__(self, interpreter: Optional[Interpreter] = None, /, *,
+                 workers: Optional[int] = None,
+                 timeout: Optional[float] = None) -> None:
+        if interpreter is None:
+            interpreter = Interpreter()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError('the pool must have at least 1 worker')
+
+        self.server = Server(interpreter)
+        self.size = workers
+        self.timeout = timeout
+        self.workers: List[_Worker] = []
+        self.selector = DefaultSelector()
+
+        # the objects made so far are left out of the garbage collection,
+        # which would otherwise copy the pages they share with the workers
+        gc.freeze()
+
+        for _ in range(workers):
+            self._spawn()
+
+    def __repr__(self, /):
+        return f'<WorkerPool of {len(self.workers)} workers>'
+
+    def __enter__(self, /) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, /, *exc_info) -> None:
+        self.close()
+
+    def _spawn(self, /) -> _Worker:
+        job_read, job_write = os.pipe()
+        result_read, result_write = os.pipe()
+
+        # the buffered output would be written by both processes otherwise
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.close(job_write)
+                os.close(result_read)
+                for worker in self.workers:
+                    worker.jobs.close()
+                    worker.results.close()
+                self.selector.close()
+
+                with os.fdopen(job_read) as jobs, \
+                        os.fdopen(result_write, 'w') as results:
+                    _serve_jobs(self.server, jobs, results)
+                status = 0
+            finally:
+                os._exit(status)
+
+        os.close(job_read)
+        os.close(result_write)
+
+        worker = _Worker(pid, os.fdopen(job_write, 'w'),
+                         os.fdopen(result_read))
+        self.workers.append(worker)
+        self.selector.register(worker.results, EVENT_READ, worker)
+        return worker
+
+    def _stop(self, worker: _Worker, /, *, force: bool = False) -> None:
+        self.selector.unregister(worker.results)
+        self.workers.remove(worker)
+
+        if force:
+            os.kill(worker.pid, signal.SIGKILL)
+
+        worker.jobs.close()
+        worker.results.close()
+        os.waitpid(worker.pid, 0)
+
+    def _send(self, worker: _Worker, job: dict, /) -> None:
+        worker.job = job
+        worker.started = perf_counter()
+        worker.jobs.write(f'{dumps(job)}\n')
+        worker.jobs.flush()
+
+    def _fail(self, worker: _Worker, error: str, /) -> dict:
+        # stops the worker, and returns the result of its job
+        result = {
+            'status': 1, 'output': '', 'error': error,
+            'times': {'parse': 0.0, 'run': 0.0,
+                      'total': perf_counter() - worker.started},
+            **worker.job,
+        }
+        self._stop(worker, force=True)
+        return result
+
+    def run(self, paths: Iterable[str], /) -> Iterator[dict]:
+        # yields the results in the order the jobs end, with `id` and `path`
+        jobs = ({'id': index, 'path': f'{path}'}
+                for index, path in enumerate(paths))
+
+        # the workers left running the jobs of a run which wasn't finished
+        for worker in [*self.workers]:
+            if worker.job is not None:
+                self._stop(worker, force=True)
+                self._spawn()
+
+        idle = deque(self.workers)
+        running = 0
+
+        while True:
+            while idle:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                self._send(idle.popleft(), job)
+                running += 1
+
+            if not running:
+                return
+
+            for key, _ in self.selector.select(self._wait_time()):
+                worker = key.data
+                line = worker.results.readline()
+
+                if worker.job is None:
+                    # died while waiting for a job
+                    self._stop(worker, force=True)
+                    idle.remove(worker)
+                    idle.append(self._spawn())
+                    continue
+                elif line:
+                    result = loads(line)
+                    result['times']['total'] = perf_counter() - worker.started
+                    worker.job = None
+                    idle.append(worker)
+                else:
+                    result = self._fail(worker, 'WorkerError: the worker '
+                                                'died running the job')
+                    idle.append(self._spawn())
+
+                running -= 1
+                yield result
+
+            now = perf_counter()
+            for worker in [*self.workers]:
+                if (worker.job is not None and self.timeout is not None and
+                        now - worker.started > self.timeout):
+                    result = self._fail(
+                        worker, f'TimeoutError: the job took more than '
+                                f'{self.timeout:g} seconds',
+                    )
+                    idle.append(self._spawn())
+                    running -= 1
+                    yield result
+
+    def _wait_time(self, /) -> Optional[float]:
+        # the time until the first running job times out
+        if self.timeout is None:
+            return None
+
+        started = [worker.started for worker in self.workers
+                   if worker.job is not None]
+        if not started:
+            return None
+        return max(0.0, min(started) + self.timeout - perf_counter())
+
+    def close(self, /) -> None:
+        for worker in [*self.workers]:
+            self._stop(worker, force=worker.job is not None)
+
+        self.selector.close()
+        gc.unfreeze()
+
+
+def percentile(values: List[float], percent: float, /) -> float:
+    # the percentile of the sorted values, by the nearest rank
+    if not values:
+        return 0.0
+
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def batch_report(results: List[dict], elapsed: float, /) -> str:
+    # the failures, the throughput and the percentiles of the phase times
+    failed = sum(result['status'] != 0 for result in results)
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+
+    lines = [
+        f'{len(results)} jobs, {failed} failed, in {elapsed:.2f} s '
+        f'({throughput:.1f} jobs/s)',
+    ]
+
+    for phase in PHASES:
+        times = sorted(result['times'][phase] * 1000 for result in results)
+        lines.append(
+            f'{phase}: p50 {percentile(times, 50):.1f} ms, '
+            f'p90 {percentile(times, 90):.1f} ms, '
+            f'p99 {percentile(times, 99):.1f} ms'
+        )
+
+    return '\n'.join(lines)
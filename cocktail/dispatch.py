@@ -0,0 +1,246 @@
+from operator import (
+    add, and_, eq, floordiv, ge, gt, le, lshift, lt, mod, mul, ne, or_, pow,
+    rshift, sub, truediv, xor,
+)
+from typing import Callable, Dict, Optional, Tuple
+
+from .obj import (
+    PRIMITIVE_TYPES, BooleanType, DictType, ListType, NumberType, RegexType,
+    SetType, StringType, TupleType, box, unbox,
+)
+
+
+__all__ = [
+    'BINARY_METHODS',
+    'INPLACE_METHODS',
+    'COMPARE_METHODS',
+    'BINARY_DISPATCH',
+    'INPLACE_DISPATCH',
+    'COMPARE_DISPATCH',
+    'register_binary',
+    'register_inplace',
+    'register_compare',
+    'binary_function',
+    'inplace_function',
+    'compare_function',
+]
+
+
+# operator symbol -> (method, reflected method)
+BINARY_METHODS = {
+    '+': ('__add__', '__radd__'),
+    '-': ('__sub__', '__rsub__'),
+    '*': ('__mul__', '__rmul__'),
+    '/': ('__truediv__', '__rtruediv__'),
+    '//': ('__floordiv__', '__rfloordiv__'),
+    '%': ('__mod__', '__rmod__'),
+    '**': ('__pow__', '__rpow__'),
+    '<<': ('__lshift__', '__rlshift__'),
+    '>>': ('__rshift__', '__rrshift__'),
+    '&': ('__and__', '__rand__'),
+    '^': ('__xor__', '__rxor__'),
+    '|': ('__or__', '__ror__'),
+}
+
+# operator symbol -> in-place method
+INPLACE_METHODS = {
+    '+': '__iadd__',
+    '-': '__isub__',
+    '*': '__imul__',
+    '/': '__itruediv__',
+    '//': '__ifloordiv__',
+    '%': '__imod__',
+    '**': '__ipow__',
+    '<<': '__ilshift__',
+    '>>': '__irshift__',
+    '&': '__iand__',
+    '^': '__ixor__',
+    '|': '__ior__',
+}
+
+# operator symbol -> (method, reflected method,
+#                     inverse method, reflected inverse method)
+COMPARE_METHODS = {
+    '==': ('__eq__', '__eq__', '__ne__', '__ne__'),
+    '!=': ('__ne__', '__ne__', '__eq__', '__eq__'),
+    '<': ('__lt__', '__gt__', '__ge__', '__le__'),
+    '<=': ('__le__', '__ge__', '__gt__', '__lt__'),
+    '>': ('__gt__', '__lt__', '__le__', '__ge__'),
+    '>=': ('__ge__', '__le__', '__lt__', '__gt__'),
+}
+
+BINARY_DISPATCH: Dict[Tuple[type, type, str], Optional[Callable]] = {}
+INPLACE_DISPATCH: Dict[Tuple[type, type, str], Optional[Callable]] = {}
+COMPARE_DISPATCH: Dict[Tuple[type, type, str], Optional[Callable]] = {}
+
+
+def register_binary(op: str, left_type: type, right_type: type,
+                    func: Callable = None, /):
+    # usable as a decorator when `func` is omitted
+    if op not in BINARY_METHODS:
+        raise ValueError(f'unknown binary operator {op!r}')
+
+    def decorator(func):
+        BINARY_DISPATCH[left_type, right_type, op] = func
+        return func
+
+    return decorator if func is None else decorator(func)
+
+
+def register_inplace(op: str, left_type: type, right_type: type,
+                     func: Callable = None, /):
+    # usable as a decorator when `func` is omitted
+    if op not in INPLACE_METHODS:
+        raise ValueError(f'unknown binary operator {op!r}')
+
+    def decorator(func):
+        INPLACE_DISPATCH[left_type, right_type, op] = func
+        return func
+
+    return decorator if func is None else decorator(func)
+
+
+def register_compare(op: str, left_type: type, right_type: type,
+                     func: Callable = None, /):
+    # usable as a decorator when `func` is omitted
+    if op not in COMPARE_METHODS:
+        raise ValueError(f'unknown comparison operator {op!r}')
+
+    def decorator(func):
+        COMPARE_DISPATCH[left_type, right_type, op] = func
+        return func
+
+    return decorator if func is None else decorator(func)
+
+
+def _method(cls: type, name: str, /) -> Optional[Callable]:
+    # the defaults of `object` only compare identities, so that they can't
+    # be resolved by the types of the operands alone
+    for base in cls.__mro__[:-1]:
+        if name in base.__dict__:
+            return base.__dict__[name]
+
+
+def _reflected(method: Callable, /) -> Callable:
+    def func(left, right, /):
+        return method(right, left)
+    return func
+
+
+def _inverted(method: Callable, /) -> Callable:
+    def func(left, right, /):
+        return ~method(left, right)
+    return func
+
+
+def _inverted_reflected(method: Callable, /) -> Callable:
+    def func(left, right, /):
+        return ~method(right, left)
+    return func
+
+
+def _unboxed(func: Callable, /) -> Callable:
+    def unboxed_func(left, right, /):
+        return unbox(func(box(left), box(right)))
+    return unboxed_func
+
+
+def _resolve(table, op, left, right, /):
+    # unboxed values have the semantics of their wrapper types, the special
+    # methods of the Python types don't apply, and the other pairs that
+    # aren't registered are unsupported
+    key = (type(left), type(right), op)
+
+    func = None
+    if key[0] in PRIMITIVE_TYPES or key[1] in PRIMITIVE_TYPES:
+        func = table.get((type(box(left)), type(box(right)), op))
+        if func is not None:
+            func = _unboxed(func)
+
+    table[key] = func
+    return func
+
+
+def binary_function(op: str, left, right, /) -> Optional[Callable]:
+    # None if the types of the operands don't support the operator
+    try:
+        return BINARY_DISPATCH[type(left), type(right), op]
+    except KeyError:
+        return _resolve(BINARY_DISPATCH, op, left, right)
+
+
+def inplace_function(op: str, left, right, /) -> Optional[Callable]:
+    # the in-place method registered for the types, or the binary operator
+    key = (type(left), type(right), op)
+    try:
+        return INPLACE_DISPATCH[key]
+    except KeyError:
+        INPLACE_DISPATCH[key] = func = binary_function(op, left, right)
+        return func
+
+
+def compare_function(op: str, left, right, /) -> Optional[Callable]:
+    # None if the types of the operands don't support the comparison
+    try:
+        return COMPARE_DISPATCH[type(left), type(right), op]
+    except KeyError:
+        return _resolve(COMPARE_DISPATCH, op, left, right)
+
+
+def _register_methods(cls: type, other: type, /) -> None:
+    # registers the special methods of `cls`, which take the operands of
+    # the type `other`, in the order Python tries them: the methods of the
+    # left operand, the reflected ones of the right operand, and then the
+    # inverse comparisons
+    for op, (name, reflected) in BINARY_METHODS.items():
+        if (method := _method(cls, name)) is not None:
+            BINARY_DISPATCH[cls, other, op] = method
+        if (method := _method(cls, reflected)) is not None:
+            BINARY_DISPATCH.setdefault((other, cls, op), _reflected(method))
+
+    for op, name in INPLACE_METHODS.items():
+        if (method := _method(cls, name)) is not None:
+            INPLACE_DISPATCH[cls, other, op] = method
+
+    for op, names in COMPARE_METHODS.items():
+        for name, key, wrapper in zip(
+                names, ((cls, other, op), (other, cls, op)) * 2,
+                (None, _reflected, _inverted, _inverted_reflected)):
+            if (method := _method(cls, name)) is None:
+                continue
+            elif wrapper is None:
+                COMPARE_DISPATCH[key] = method
+            else:
+                COMPARE_DISPATCH.setdefault(key, wrapper(method))
+
+
+# the special methods of the types take the operands of one type, and
+# return NotImplemented for the others
+for _left, _right in ((BooleanType, NumberType), (NumberType, NumberType),
+                      (StringType, StringType), (TupleType, TupleType),
+                      (ListType, ListType), (DictType, DictType),
+                      (SetType, SetType), (RegexType, RegexType)):
+    _register_methods(_left, _right)
+
+# fast paths for the unboxed values, matching the methods of `NumberType`
+# and `StringType` on the values they wrap
+for _left in (int, float):
+    for _right in (int, float):
+        for _op, _func in (('+', add), ('-', sub), ('*', mul),
+                           ('/', truediv), ('//', floordiv), ('%', mod),
+                           ('**', pow)):
+            register_binary(_op, _left, _right, _func)
+
+        for _op, _func in (('==', eq), ('!=', ne), ('<', lt), ('<=', le),
+                           ('>', gt), ('>=', ge)):
+            register_compare(_op, _left, _right, _func)
+
+for _op, _func in (('<<', lshift), ('>>', rshift), ('&', and_), ('^', xor),
+                   ('|', or_)):
+    register_binary(_op, int, int, _func)
+
+register_binary('+', str, str, add)
+register_compare('==', str, str, eq)
+register_compare('!=', str, str, ne)
+
+del _left, _right, _op, _func
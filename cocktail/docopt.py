@@ -120,8 +120,9 @@ class ChildPattern(Pattern):
             return False, left, collected
         left_ = left[:pos] + left[pos + 1:]
         same_name = [a for a in collected if a.name == self.name]
-        if isinstance(self.value, (int, float)):
-            increment = (1 if isinstance(self.value, int)
+        # the exact types, as booleans are integers but don't accumulate
+        if type(self.value) in {int, list}:
+            increment = (1 if type(self.value) is int
                          else [match.value] if isinstance(match.value, str)
                          else match.value)
             if not same_name:
@@ -1,27 +1,61 @@
+from typing import NoReturn, Optional
+
 from .rply import Token
 
 from .moduleinfo import ModuleInfo
+from .source import source_line, source_position
+
+
+__all__ = ['CocktailError', 'throw', 'throw_at']
+
+
+class CocktailError(Exception):
+    # the place of the error is None where it isn't known
+    def __init__(self, error: str = 'Error', msg: str = '', /, *,
+                 path: Optional[str] = None, lineno: Optional[int] = None,
+                 colno: Optional[int] = None, line: Optional[str] = None,
+                 pointer: bool = True) -> None:
+        super().__init__(error, msg)
+        self.error = error
+        self.msg = msg
+        self.path = path
+        self.lineno = lineno
+        self.colno = colno
+        self.line = line
+        self.pointer = pointer
 
+    def __str__(self, /):
+        if self.lineno is None:
+            return f'{self.error}: {self.msg}'
 
-__all__ = ['throw']
+        if self.pointer and self.colno is not None:
+            padding = ' ' * (self.colno - 1)
+            pointer = f'    {padding}^\n'
+        else:
+            pointer = ''
+
+        return (f'  File "{self.path}", line {self.lineno}\n'
+                f'    {self.line}\n'
+                f'{pointer}'
+                f'{self.error}: {self.msg}')
 
 
 def throw(info: ModuleInfo, token: Token, error: str = 'Error', msg: str = '',
-          *, line: bool = False) -> None:
+          *, line: bool = False) -> NoReturn:
+    # points at the token unless `line` is true
     if not isinstance(info, ModuleInfo):
-        print(info, token)
-        print(f'{error}: {msg}')
-        exit()
+        raise CocktailError(error, msg)
+
     pos = token.getsourcepos()
-    source_line = info.source.split('\n')[pos.lineno - 1]
-
-    if line:
-        pointer = ''
-    else:
-        padding = ' ' * (pos.colno - 1)
-        pointer = f'    {padding}^\n'
-
-    exit(f'  File "{info.path}", line {pos.lineno}\n'
-         f'    {source_line}\n'
-         f'{pointer}'
-         f'{error}: {msg}')
+    raise CocktailError(error, msg, path=info.path, lineno=pos.lineno,
+                        colno=pos.colno,
+                        line=source_line(info.source, pos.lineno),
+                        pointer=not line)
+
+
+def throw_at(info: ModuleInfo, index: int, error: str = 'Error',
+             msg: str = '', /) -> NoReturn:
+    # for the errors found before there are tokens
+    lineno, colno = source_position(info.source, index)
+    raise CocktailError(error, msg, path=info.path, lineno=lineno,
+                        colno=colno, line=source_line(info.source, lineno))
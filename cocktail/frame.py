@@ -0,0 +1,67 @@
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, Optional
+
+
+__all__ = ['UNBOUND', 'Frame', 'FrameView']
+
+
+class _Unbound:
+    __slots__ = ()
+
+    def __repr__(self, /):
+        return '<unbound>'
+
+
+UNBOUND = _Unbound()
+
+
+class Frame:
+    # the slots of the variables are assigned by the resolver, and the frames
+    # of the calls hold the `result` or the tail `call` they return
+    __slots__ = ('slots', 'values', 'model', 'globals', 'result', 'call')
+
+    def __init__(self, slots: Dict[str, int], model,
+                 globals: Optional[list] = None, /) -> None:
+        self.slots = slots
+        self.values = [UNBOUND] * len(slots)
+        self.model = model
+        self.globals = self.values if globals is None else globals
+        self.result = None
+        self.call = None
+
+    def __repr__(self, /):
+        return f'Frame({dict(FrameView(self))})'
+
+
+class FrameView(Mapping):
+    # leaves out the variables still bound to their `defaults`
+    __slots__ = ('_frame', '_convert', '_defaults')
+
+    def __init__(self, frame: Frame, convert: Optional[Callable] = None,
+                 defaults: Optional[Dict[str, object]] = None, /) -> None:
+        self._frame = frame
+        self._convert = convert
+        self._defaults = {} if defaults is None else defaults
+
+    def _bound(self, name: str, value, /) -> bool:
+        return (value is not UNBOUND and
+                value is not self._defaults.get(name, UNBOUND))
+
+    def __getitem__(self, name: str, /):
+        slot = self._frame.slots.get(name)
+        value = UNBOUND if slot is None else self._frame.values[slot]
+        if not self._bound(name, value):
+            raise KeyError(name)
+        return value if self._convert is None else self._convert(value)
+
+    def __iter__(self, /) -> Iterator[str]:
+        values = self._frame.values
+        for name, slot in self._frame.slots.items():
+            if self._bound(name, values[slot]):
+                yield name
+
+    def __len__(self, /) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self, /):
+        return f'{dict(self)}'
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from os import stat
+from typing import Hashable, Optional
+
+from .ast import Module
+from .moduleinfo import ModuleInfo
+from .obj import BOXED, UNBOXED, ModuleType
+from .output import OutputSink, redirect_output
+from .parser import Parser, parse_module
+from .source import Source
+
+
+__all__ = ['Interpreter']
+
+
+class Interpreter:
+    # runs many programs, one at a time, with one parser and a cache of the
+    # parsed modules
+    def __init__(self, /, *, unboxed: bool = False,
+                 output: Optional[OutputSink] = None,
+                 log: str = 'none', cache_size: int = 128,
+                 recursion_limit: Optional[int] = None) -> None:
+        self.model = UNBOXED if unboxed else BOXED
+        self.output = output
+        self.cache_size = cache_size
+        self.recursion_limit = recursion_limit
+        self.modules: OrderedDict[Hashable, Module] = OrderedDict()
+        self._grammar = Parser()
+        self._parser = self._grammar.build(log=log)
+
+    def __repr__(self, /):
+        return f'<Interpreter of the {self.model.name} model>'
+
+    def parse(self, source: Source, /, *, path: str = '<string>') -> Module:
+        info = ModuleInfo(source, path)
+        self._grammar.info = info
+        try:
+            return parse_module(self._parser, info, model=self.model)
+        finally:
+            self._grammar.info = None
+
+    def _cached(self, key: Hashable, /) -> Optional[Module]:
+        try:
+            self.modules.move_to_end(key)
+        except KeyError:
+            return None
+
+        return self.modules[key]
+
+    def _cache(self, key: Hashable, module: Module, /) -> Module:
+        if self.cache_size > 0:
+            self.modules[key] = module
+            if len(self.modules) > self.cache_size:
+                self.modules.popitem(last=False)
+
+        return module
+
+    def compile(self, source: Source, /, *,
+                path: str = '<string>') -> Module:
+        key = (path, source if isinstance(source, str) else bytes(source))
+        module = self._cached(key)
+        if module is None:
+            module = self._cache(key, self.parse(source, path=path))
+
+        return module
+
+    def load(self, path: str, /) -> Module:
+        # parsed again when the file changes
+        status = stat(path)
+        key = (path, status.st_mtime_ns, status.st_size)
+        module = self._cached(key)
+        if module is None:
+            # the cached modules keep their sources for the error reports,
+            # so the files are read rather than memory-mapped
+            with open(path, 'rb') as file:
+                source = file.read()
+            module = self._cache(key, self.parse(source, path=path))
+
+        return module
+
+    def execute(self, module: Module, /, *,
+                output: Optional[OutputSink] = None) -> ModuleType:
+        if output is None:
+            output = self.output
+        limit = self.recursion_limit
+        if output is None:
+            return module.eval(recursion_limit=limit)
+
+        with redirect_output(output):
+            return module.eval(recursion_limit=limit)
+
+    def run(self, source: Source, /, *, path: str = '<string>',
+            output: Optional[OutputSink] = None) -> ModuleType:
+        return self.execute(self.compile(source, path=path), output=output)
+
+    def run_file(self, path: str, /, *,
+                 output: Optional[OutputSink] = None) -> ModuleType:
+        return self.execute(self.load(path), output=output)
@@ -1,7 +1,10 @@
-from re import match
+from re import Match, compile as compile_regex, match
+from typing import Iterator, Union
 
-from rply import LexerGenerator as RplyLexerGenerator
-from rply.lexer import LexerStream, Lexer
+from .rply import LexerGenerator as RplyLexerGenerator
+from .rply.errors import LexingError
+from .rply.lexer import LexerStream, Lexer
+from .rply.token import SourcePosition, Token
 
 from .ast import (
     Add, Sub, Mult, Div, FloorDiv, Mod, Pow, LShift, RShift,
@@ -15,6 +18,7 @@ from .ast import (
     PreIncrement, PreDecrement,
 )
 from .obj import BooleanType, NoneType
+from .source import Source, source_column
 
 
 __all__ = [
@@ -26,6 +30,9 @@ __all__ = [
     'CMP_OP',
     'UNARY_OP',
     'LexerGenerator',
+    'LazyToken',
+    'StringLexerStream',
+    'BytesLexerStream',
     'lexer',
     'lex',
 ]
@@ -33,7 +40,7 @@ __all__ = [
 
 RESERVED_KEYWORD = [
     'break', 'continue', 'elif', 'else', 'func',
-    'for', 'if', 'in', 'not', 'of', 'while'
+    'for', 'if', 'in', 'memo', 'not', 'of', 'return', 'while'
 ]
 
 
@@ -202,9 +209,147 @@ class LexerGenerator:
         return self.lexer.build()
 
 
+class LazyToken(Token):
+    # decodes its value and finds its column only when they are used
+    __slots__ = ('name', '_source', '_start', '_end', '_lineno', '_value')
+
+    def __init__(self, name: str, source: Source, start: int, end: int,
+                 lineno: int, /) -> None:
+        self.name = name
+        self._source = source
+        self._start = start
+        self._end = end
+        self._lineno = lineno
+        self._value = None
+
+    @property
+    def value(self, /) -> str:
+        if self._value is None:
+            self._value = self._source[self._start:self._end].decode()
+        return self._value
+
+    @value.setter
+    def value(self, value: str, /) -> None:
+        self._value = value
+
+    @property
+    def source_pos(self, /) -> SourcePosition:
+        return SourcePosition(self._start, self._lineno,
+                              source_column(self._source, self._start))
+
+
+# the pattern of the names in bytes, which takes the non-ASCII bytes in as
+# well, for the names to be decoded and matched by the pattern in strings
+BYTES_NAME_PATTERN = r'(?:[A-Za-z_]|[\x80-\xff])(?:\w|[\x80-\xff])*'
+
+
+def _tokens_pattern(kind: type, /):
+    # the keywords are left to the names, which are looked up in `KEYWORDS`
+    pattern = '|'.join(
+        f'(?P<{name}>{BYTES_NAME_PATTERN})'
+        if name == 'NAME' and kind is bytes else f'(?P<{name}>{pattern})'
+        for name, pattern in TOKEN_PATTERNS
+        if pattern not in RESERVED_KEYWORD
+    )
+    return compile_regex(pattern if kind is str else pattern.encode())
+
+
+def _ignored_pattern(kind: type, /):
+    pattern = f'(?:{"|".join(IGNORED_PATTERNS)})+'
+    return compile_regex(pattern if kind is str else pattern.encode())
+
+
+class StringLexerStream:
+    # the patterns are tried in order through one regular expression, like
+    # the rply lexer tries them one by one
+    TOKENS = _tokens_pattern(str)
+    IGNORED = _ignored_pattern(str)
+    KEYWORDS = {keyword: keyword.upper() for keyword in RESERVED_KEYWORD}
+    NEWLINE = '\n'
+
+    def __init__(self, source: Source, /) -> None:
+        self.source = source
+        self.idx = 0
+        self._lineno = 1
+        self._line_start = 0
+
+    def __iter__(self, /) -> Iterator[Token]:
+        return self
+
+    def __next__(self, /) -> Token:
+        source = self.source
+
+        # no token spans lines, only the ignored ones can
+        ignored = self.IGNORED.match(source, self.idx)
+        if ignored is not None:
+            text = ignored.group()
+            if self.NEWLINE in text:
+                self._lineno += text.count(self.NEWLINE)
+                self._line_start = (ignored.start() +
+                                    text.rfind(self.NEWLINE) + 1)
+            self.idx = ignored.end()
+
+        if self.idx >= len(source):
+            raise StopIteration
+
+        token = self.TOKENS.match(source, self.idx)
+        if token is None:
+            raise LexingError(None, SourcePosition(self.idx, -1, -1))
+
+        name = token.lastgroup
+        if name == 'NAME':
+            self.idx = self.name_end(token)
+            name = self.KEYWORDS.get(source[token.start():self.idx], name)
+        else:
+            self.idx = token.end()
+
+        return self.token(name, token.start())
+
+    next = __next__
+
+    def name_end(self, token: Match, /) -> int:
+        return token.end()
+
+    def token(self, name: str, start: int, /) -> Token:
+        return Token(name, self.source[start:self.idx],
+                     SourcePosition(start, self._lineno,
+                                    start - self._line_start + 1))
+
+
+class BytesLexerStream(StringLexerStream):
+    # the names with non-ASCII characters are decoded to be matched
+    TOKENS = _tokens_pattern(bytes)
+    IGNORED = _ignored_pattern(bytes)
+    KEYWORDS = {keyword.encode(): keyword.upper()
+                for keyword in RESERVED_KEYWORD}
+    NEWLINE = b'\n'
+    NAME = compile_regex(dict(TOKEN_PATTERNS)['NAME'])
+
+    def name_end(self, token: Match, /) -> int:
+        text = token.group()
+        if text.isascii():
+            return token.end()
+
+        try:
+            name = self.NAME.match(text.decode())
+        except UnicodeDecodeError:
+            name = None
+        if name is None:
+            raise LexingError(None, SourcePosition(token.start(), -1, -1))
+
+        # the name ends where the pattern in strings stops matching
+        return token.start() + len(name.group().encode())
+
+    def token(self, name: str, start: int, /) -> LazyToken:
+        return LazyToken(name, self.source, start, self.idx, self._lineno)
+
+
 lexer_generator = LexerGenerator()
 lexer = lexer_generator.get_lexer()
 
 
-def lex(source: str) -> LexerStream:
-    return lexer.lex(source)
+def lex(source: Source) -> Union[StringLexerStream, BytesLexerStream]:
+    if isinstance(source, str):
+        return StringLexerStream(source)
+    else:
+        return BytesLexerStream(source)
@@ -0,0 +1,52 @@
+from mmap import ACCESS_READ, mmap
+import sys
+from typing import BinaryIO, Iterator, Optional, TextIO
+
+
+__all__ = ['read_lines']
+
+
+# the size of the reads from the files
+BUFFER_SIZE = 1 << 20
+
+
+def _lines(file: TextIO, /, *, close: bool = True) -> Iterator[str]:
+    # the lines without their line breaks, like `input` reads them
+    try:
+        for line in file:
+            yield line[:-1] if line[-1:] == '\n' else line
+    finally:
+        if close:
+            file.close()
+
+
+def _mapped_lines(file: BinaryIO, /) -> Iterator[str]:
+    with file:
+        try:
+            mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            return
+
+        with mapped:
+            for line in iter(mapped.readline, b''):
+                # like the universal newlines of the text files
+                if line[-2:] == b'\r\n':
+                    line = line[:-2]
+                elif line[-1:] == b'\n':
+                    line = line[:-1]
+                yield line.decode()
+
+
+def read_lines(path: Optional[str] = None, /, *,
+               mapped: bool = False) -> Iterator[str]:
+    # the lines without their line breaks, of the standard input if `path`
+    # is None
+    if path is None:
+        # through the buffer of `sys.stdin`, which `input` reads from as
+        # well, and left open when the lines are done
+        return _lines(sys.stdin, close=False)
+    elif mapped:
+        return _mapped_lines(open(path, 'rb'))
+    else:
+        return _lines(open(path, buffering=BUFFER_SIZE))
@@ -8,3 +8,7 @@ __all__ = ['ModuleInfo']
 class ModuleInfo:
     source: str
     path: str = '<unknown>'
+
+    def __deepcopy__(self, memo, /):
+        # the sources of the files are memory-mapped, and can't be copied
+        return self
@@ -1,7 +1,12 @@
+from array import array
+from collections import OrderedDict
 from copy import deepcopy
-from re import match
+from re import error as re_error, match
 
 from .error import throw
+from .frame import UNBOUND, FrameView
+from .regex import compile_pattern
+from .view import SliceView, slice_of
 
 
 __all__ = [
@@ -13,10 +18,18 @@ __all__ = [
     'StringType',
     'TupleType',
     'ListType',
+    'DictType',
+    'SetType',
+    'ArrayType',
+    'RangeType',
+    'RegexType',
+    'IteratorType',
     'NameType',
     'SliceType',
     'ArgType',
     'ArgumentsType',
+    'Binding',
+    'Memo',
     'FunctionType',
     'BuiltinFunctionType',
 
@@ -24,35 +37,85 @@ __all__ = [
     'false',
     'none',
 
+    'SMALL_NUMBERS',
+    'PRIMITIVE_TYPES',
+    'box',
+    'unbox',
+    'hash_key',
+    'key_value',
+    'type_name',
+    'represent',
+    'display',
+    'ValueModel',
+    'BOXED',
+    'UNBOXED',
+
     'RESERVED',
     'DEFAULT_ENV',
     'CONSTRUCTOR_TYPES',
 ]
 
 
+# the length from which concatenated strings keep their parts
+_ROPE_THRESHOLD = 256
+
+
+def _number_repr(value, /):
+    if type(value) is int:
+        return f'{value}'
+    elif value % 1 == 0:
+        return f'{value:.0f}'
+    else:
+        return f'{value}'
+
+
+def _integer(value, op, /):
+    # whole floats are accepted by the bitwise operators
+    if value % 1 != 0:
+        raise TypeError(f'floats cannot be in {op} operations')
+    return int(value)
+
+
 class Type:
-    pass
+    __slots__ = ()
 
 
 class ModuleType(Type):
+    # the result of running a module, whose variables are read-only, without
+    # the builtins the module didn't rebind
+    __slots__ = ('frame',)
+
     # ----- Initialization Methods ----- #
-    def __init__(self, env, /):
-        self.env = deepcopy(env)
+    def __init__(self, frame, /):
+        self.frame = frame
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
         return f'Module({self.env})'
 
+    # ----- Inner Operations ----- #
+    @property
+    def env(self, /):
+        return FrameView(self.frame, box, DEFAULT_ENV)
+
+    def copy(self, /):
+        return ModuleType(deepcopy(self.frame))
+
 
 class BooleanType(Type):
+    __slots__ = ('value',)
+
     # ----- Initialization Methods ----- #
-    def __init__(self, value, /):
-        self.value = value
+    def __new__(cls, value, /):
+        return true if value else false
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
         return 'true' if self.value else 'false'
 
+    def __reduce__(self, /):
+        return 'true' if self.value else 'false'
+
     # ----- Transformation Methods ----- #
     def __hash__(self, /):
         return hash(self.value)
@@ -67,24 +130,24 @@ class BooleanType(Type):
         return NumberType(+self.value)
 
     def __invert__(self, /):
-        return BooleanType(not self.value)
+        return false if self.value else true
 
     # ----- Bitwise Calculation Methods ----- #
     def __and__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value & other.value)
+            return true if self.value & other.value else false
         else:
             return NotImplemented
 
     def __or__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value | other.value)
+            return true if self.value | other.value else false
         else:
             return NotImplemented
 
     def __xor__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value ^ other.value)
+            return true if self.value ^ other.value else false
         else:
             return NotImplemented
 
@@ -98,10 +161,15 @@ class BooleanType(Type):
 
 
 class NoneType(Type):
+    __slots__ = ()
+
     # ----- Initialization Methods ----- #
     def __init__(self, /):
         pass
 
+    def __reduce__(self, /):
+        return 'none'
+
     # ----- Transformation Methods ----- #
     def __hash__(self, /):
         return hash(None)
@@ -115,16 +183,23 @@ class NoneType(Type):
 
 
 class NumberType(Type):
+    __slots__ = ('value',)
+
     # ----- Initialization Methods ----- #
-    def __init__(self, value, /):
+    def __new__(cls, value, /):
+        if (type(value) is int and
+                (self := SMALL_NUMBERS.get(value)) is not None):
+            return self
+        self = object.__new__(cls)
         self.value = value
+        return self
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
-        if self.value % 1 == 0:
-            return f'{self.value:.0f}'
-        else:
-            return f'{self.value}'
+        return _number_repr(self.value)
+
+    def __reduce__(self, /):
+        return NumberType, (self.value,)
 
     # ----- Transformation Methods ----- #
     def __hash__(self, /):
@@ -140,46 +215,47 @@ class NumberType(Type):
         return self
 
     def __invert__(self, /):
-        if self.value % 1 == 0:
+        if type(self.value) is int:
+            return NumberType(~self.value)
+        elif self.value % 1 == 0:
             return NumberType(~int(self.value))
         else:
-            throw(self.value.info, self.value.token, 'TypeError',
-                  'floats cannot be inverted', line=True)
+            raise TypeError('floats cannot be inverted')
 
     # ----- Comparison Methods ----- #
     def __lt__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value < other.value)
+            return true if self.value < other.value else false
         else:
             return NotImplemented
 
     def __le__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value <= other.value)
+            return true if self.value <= other.value else false
         else:
             return NotImplemented
 
     def __eq__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value == other.value)
+            return true if self.value == other.value else false
         else:
             return NotImplemented
 
     def __ne__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value != other.value)
+            return true if self.value != other.value else false
         else:
             return NotImplemented
 
     def __gt__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value > other.value)
+            return true if self.value > other.value else false
         else:
             return NotImplemented
 
     def __ge__(self, other, /):
         if isinstance(other, NumberType):
-            return BooleanType(self.value >= other.value)
+            return true if self.value >= other.value else false
         else:
             return NotImplemented
 
@@ -228,62 +304,52 @@ class NumberType(Type):
 
     def __lshift__(self, other, /):
         if isinstance(other, NumberType):
-            if self.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in << operations', line=True)
-            if other.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in << operations', line=True)
-            return NumberType(int(self.value) << int(other.value))
+            try:
+                return NumberType(self.value << other.value)
+            except TypeError:
+                return NumberType(_integer(self.value, '<<') <<
+                                  _integer(other.value, '<<'))
         else:
             return NotImplemented
 
     def __rshift__(self, other, /):
         if isinstance(other, NumberType):
-            if self.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in >> operations', line=True)
-            if other.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in >> operations', line=True)
-            return NumberType(int(self.value) >> int(other.value))
+            try:
+                return NumberType(self.value >> other.value)
+            except TypeError:
+                return NumberType(_integer(self.value, '>>') >>
+                                  _integer(other.value, '>>'))
         else:
             return NotImplemented
 
     # ----- Bitwise Calculation Methods ----- #
     def __and__(self, other, /):
         if isinstance(other, NumberType):
-            if self.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in & operations', line=True)
-            if other.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in & operations', line=True)
-            return NumberType(int(self.value) & int(other.value))
+            try:
+                return NumberType(self.value & other.value)
+            except TypeError:
+                return NumberType(_integer(self.value, '&') &
+                                  _integer(other.value, '&'))
         else:
             return NotImplemented
 
     def __xor__(self, other, /):
         if isinstance(other, NumberType):
-            if self.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in ^ operations', line=True)
-            if other.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in ^ operations', line=True)
-            return NumberType(int(self.value) ^ int(other.value))
+            try:
+                return NumberType(self.value ^ other.value)
+            except TypeError:
+                return NumberType(_integer(self.value, '^') ^
+                                  _integer(other.value, '^'))
         else:
             return NotImplemented
 
     def __or__(self, other, /):
         if isinstance(other, NumberType):
-            if self.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in | operations', line=True)
-            if other.value % 1 != 0:
-                throw(self.value.info, self.value.token, 'TypeError',
-                      'floats cannot be in | operations', line=True)
-            return NumberType(int(self.value) | int(other.value))
+            try:
+                return NumberType(self.value | other.value)
+            except TypeError:
+                return NumberType(_integer(self.value, '|') |
+                                  _integer(other.value, '|'))
         else:
             return NotImplemented
 
@@ -293,7 +359,7 @@ class NumberType(Type):
         if obj is None:
             return cls(0)
 
-        value = obj.eval(env=env)
+        value = box(obj.eval(env=env))
 
         if isinstance(value, BooleanType):
             return cls(+value.value)
@@ -314,9 +380,26 @@ class NumberType(Type):
 
 
 class StringType(Type):
+    # long concatenations keep their parts and long slices are views, which
+    # are joined when the value is needed
+    __slots__ = ('_value', '_parts', '_count', '_view', '_length')
+
     # ----- Initialization Methods ----- #
     def __init__(self, value, /):
-        self.value = value
+        self._value = value
+        self._parts = None
+        self._view = None
+        self._length = len(value)
+
+    @property
+    def value(self, /):
+        if self._value is None:
+            if self._parts is None:
+                self._value = self._view.materialize()
+                self._view = None
+            else:
+                self._value = ''.join(self._parts[:self._count])
+        return self._value
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
@@ -330,35 +413,53 @@ class StringType(Type):
         return hash(self.value)
 
     def __bool__(self, /):
-        return True if self.value else False
+        return self._length != 0
 
     # ----- Iterable Methods ----- #
     def __len__(self, /):
-        return len(self.value)
+        return self._length
 
     def __getitem__(self, key, /):
-        if isinstance(key, int):
-            return self.value[key]
-        else:
-            slice = []
-            for item in (key.start, key.stop, key.step):
-                if isinstance(item, NumberType):
-                    slice.append(int(item.value))
-                else:
-                    slice.append(None)
-            start, stop, step = slice
-            return self.value[start:stop:step]
+        text = self.value if self._view is None else self._view
+
+        if not isinstance(key, slice):
+            return StringType(text[key])
+
+        text = slice_of(text, key)
+        if type(text) is str:
+            return StringType(text)
+
+        result = object.__new__(StringType)
+        result._value = None
+        result._parts = None
+        result._view = text
+        result._length = len(text)
+        return result
 
     def __iter__(self, /):
-        return iter(self.value)
+        return map(StringType, self.value if self._view is None
+                   else self._view)
 
     def __contains__(self, item, /):
         return item.value in self.value
 
+    # ----- Comparison Methods ----- #
+    def __eq__(self, other, /):
+        if isinstance(other, StringType):
+            return true if self.value == other.value else false
+        else:
+            return NotImplemented
+
+    def __ne__(self, other, /):
+        if isinstance(other, StringType):
+            return true if self.value != other.value else false
+        else:
+            return NotImplemented
+
     # ----- Calculation Methods ----- #
     def __add__(self, other, /):
         if isinstance(other, StringType):
-            return StringType(self.value + other.value)
+            return self.concat(other.value)
         else:
             return NotImplemented
 
@@ -375,19 +476,46 @@ class StringType(Type):
             return NotImplemented
 
     # ----- Inner Operations ----- #
+    def concat(self, text, /):
+        parts = self._parts
+
+        if parts is None:
+            if self._length + len(text) < _ROPE_THRESHOLD:
+                return StringType(self.value + text)
+            parts = [self.value]
+        elif len(parts) != self._count:
+            # another string was built from this one already
+            parts = parts[:self._count]
+
+        parts.append(text)
+
+        result = object.__new__(StringType)
+        result._value = None
+        result._parts = parts
+        result._count = len(parts)
+        result._view = None
+        result._length = self._length + len(text)
+        return result
+
     @classmethod
     def construct(cls, obj=None, /, *, env):
-        return cls('' if obj is None else f'{obj.eval(env=env)}')
+        return cls('' if obj is None else display(obj.eval(env=env)))
 
 
 class TupleType(Type):
+    # the values are a tuple, or a view of one for long slices
+    __slots__ = ('values',)
+
     # ----- Initialization Methods ----- #
     def __init__(self, values, /):
         self.values = values
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
-        return f'{self.values}'
+        if len(self.values) == 1:
+            return f'({represent(self.values[0])},)'
+        else:
+            return f'({", ".join(map(represent, self.values))})'
 
     # ----- Transformation Methods ----- #
     def __bool__(self, /):
@@ -398,23 +526,16 @@ class TupleType(Type):
         return len(self.values)
 
     def __getitem__(self, key, /):
-        if isinstance(key, int):
-            return self.values[key]
+        if isinstance(key, slice):
+            return TupleType(slice_of(self.values, key))
         else:
-            slice = []
-            for item in (key.start, key.stop, key.step):
-                if isinstance(item, NumberType):
-                    slice.append(int(item.value))
-                else:
-                    slice.append(None)
-            start, stop, step = slice
-            return self.values[start:stop:step]
+            return self.values[key]
 
     def __iter__(self, /):
         return iter(self.values)
 
     def __contains__(self, item, /):
-        return item in self.values
+        return _contains(self.values, item)
 
     # ----- Calculation Methods ----- #
     def __add__(self, other, /):
@@ -442,15 +563,22 @@ class TupleType(Type):
 
 
 class ListType(Type):
+    # the values are a list, or a view of one for long slices, copied when
+    # it is changed
+    __slots__ = ('values',)
+
     # ----- Initialization Methods ----- #
     def __init__(self, values, /):
         self.values = values
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
-        return f'{self.values}'
+        return f'[{", ".join(map(represent, self.values))}]'
 
     # ----- Transformation Methods ----- #
+    # lists can change, so they can't be hashed
+    __hash__ = None
+
     def __bool__(self, /):
         return True if self.values else False
 
@@ -459,23 +587,16 @@ class ListType(Type):
         return len(self.values)
 
     def __getitem__(self, key, /):
-        if isinstance(key, int):
-            return self.values[key]
+        if isinstance(key, slice):
+            return ListType(slice_of(self.values, key))
         else:
-            slice = []
-            for item in (key.start, key.stop, key.step):
-                if isinstance(item, NumberType):
-                    slice.append(int(item.value))
-                else:
-                    slice.append(None)
-            start, stop, step = slice
-            return self.values[start:stop:step]
+            return self.values[key]
 
     def __iter__(self, /):
         return iter(self.values)
 
     def __contains__(self, item, /):
-        return item in self.values
+        return _contains(self.values, item)
 
     # ----- Calculation Methods ----- #
     def __add__(self, other, /):
@@ -484,6 +605,15 @@ class ListType(Type):
         else:
             return NotImplemented
 
+    def __iadd__(self, other, /):
+        if isinstance(other, ListType):
+            if type(self.values) is SliceView:
+                self.values = self.values.materialize()
+            self.values += other.values
+            return self
+        else:
+            return NotImplemented
+
     def __mul__(self, other, /):
         if isinstance(other, ListType):
             return ListType(self.values * other.values)
@@ -502,13 +632,347 @@ class ListType(Type):
         return cls([] if obj is None else [*obj.eval(env=env)])
 
 
+class DictType(Type):
+    # the keys are stored by `hash_key`
+    __slots__ = ('entries', 'model')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, entries, model, /):
+        self.entries = entries
+        self.model = model
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return '{' + ', '.join(
+            f'{represent(key_value(key, self.model))}: {represent(value)}'
+            for key, value in self.entries.items()
+        ) + '}'
+
+    # ----- Transformation Methods ----- #
+    def __bool__(self, /):
+        return True if self.entries else False
+
+    # ----- Iterable Methods ----- #
+    def __len__(self, /):
+        return len(self.entries)
+
+    def __getitem__(self, key, /):
+        return self.entries[hash_key(key)]
+
+    def __iter__(self, /):
+        return (key_value(key, self.model) for key in self.entries)
+
+    def __contains__(self, item, /):
+        return hash_key(item) in self.entries
+
+    # ----- Calculation Methods ----- #
+    def __or__(self, other, /):
+        if isinstance(other, DictType):
+            return DictType(self.entries | other.entries, self.model)
+        else:
+            return NotImplemented
+
+    def __ior__(self, other, /):
+        if isinstance(other, DictType):
+            self.entries |= other.entries
+            return self
+        else:
+            return NotImplemented
+
+    # ----- Inner Operations ----- #
+    @classmethod
+    def construct(cls, obj=None, /, *, env):
+        if obj is None:
+            return cls({}, env.model)
+
+        value = obj.eval(env=env)
+
+        if isinstance(value, DictType):
+            return cls(value.entries.copy(), env.model)
+
+        entries = {}
+        for pair in value:
+            if not isinstance(pair, (TupleType, ListType)) or len(pair) != 2:
+                throw(obj.info, obj.token, 'TypeError',
+                      'Dict items must be pairs', line=True)
+            entries[hash_key(pair.values[0])] = pair.values[1]
+
+        return cls(entries, env.model)
+
+
+class SetType(Type):
+    # the items are stored by `hash_key`
+    __slots__ = ('values', 'model')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, values, model, /):
+        self.values = values
+        self.model = model
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        if self.values:
+            return '{' + ', '.join(represent(key_value(item, self.model))
+                                   for item in self.values) + '}'
+        else:
+            return 'Set()'
+
+    # ----- Transformation Methods ----- #
+    def __bool__(self, /):
+        return True if self.values else False
+
+    # ----- Iterable Methods ----- #
+    def __len__(self, /):
+        return len(self.values)
+
+    def __iter__(self, /):
+        return (key_value(item, self.model) for item in self.values)
+
+    def __contains__(self, item, /):
+        return hash_key(item) in self.values
+
+    # ----- Calculation Methods ----- #
+    def __sub__(self, other, /):
+        if isinstance(other, SetType):
+            return SetType(self.values - other.values, self.model)
+        else:
+            return NotImplemented
+
+    def __and__(self, other, /):
+        if isinstance(other, SetType):
+            return SetType(self.values & other.values, self.model)
+        else:
+            return NotImplemented
+
+    def __xor__(self, other, /):
+        if isinstance(other, SetType):
+            return SetType(self.values ^ other.values, self.model)
+        else:
+            return NotImplemented
+
+    def __or__(self, other, /):
+        if isinstance(other, SetType):
+            return SetType(self.values | other.values, self.model)
+        else:
+            return NotImplemented
+
+    def __ior__(self, other, /):
+        if isinstance(other, SetType):
+            self.values |= other.values
+            return self
+        else:
+            return NotImplemented
+
+    # ----- Inner Operations ----- #
+    @classmethod
+    def construct(cls, obj=None, /, *, env):
+        if obj is None:
+            return cls(set(), env.model)
+        else:
+            return cls({*map(hash_key, obj.eval(env=env))}, env.model)
+
+
+class ArrayType(Type):
+    # the numbers are doubles ('d') or 64-bit integers ('q'), and the slices
+    # are memoryviews sharing the storage
+    __slots__ = ('values', 'model')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, values, model, /):
+        self.values = values
+        self.model = model
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return f'Array([{", ".join(map(_number_repr, self.values))}])'
+
+    def __reduce__(self, /):
+        # memoryviews can't be copied, the copy of a view owns its numbers
+        return ArrayType, (array(self.typecode, self.values), self.model)
+
+    # ----- Transformation Methods ----- #
+    __hash__ = None
+
+    def __bool__(self, /):
+        return len(self.values) != 0
+
+    # ----- Iterable Methods ----- #
+    def __len__(self, /):
+        return len(self.values)
+
+    def __getitem__(self, key, /):
+        if isinstance(key, slice):
+            return ArrayType(memoryview(self.values)[key], self.model)
+        else:
+            return self.model.convert(self.values[key])
+
+    def __iter__(self, /):
+        return self.model.numbers(self.values)
+
+    def __contains__(self, item, /):
+        value = unbox(item)
+        return ((type(value) is int or type(value) is float) and
+                value in self.values)
+
+    # ----- Inner Operations ----- #
+    @property
+    def typecode(self, /):
+        if isinstance(self.values, array):
+            return self.values.typecode
+        else:
+            return self.values.format
+
+    @classmethod
+    def construct(cls, obj=None, /, *, env):
+        if obj is None:
+            return cls(array('d'), env.model)
+
+        value = obj.eval(env=env)
+
+        if isinstance(value, ArrayType):
+            return cls(array(value.typecode, value.values), env.model)
+        elif isinstance(value, RangeType):
+            return cls(array('q', value.range), env.model)
+        elif not hasattr(value, '__iter__'):
+            throw(obj.info, obj.token, 'TypeError',
+                  f"'{type_name(value)}' object is not iterable", line=True)
+
+        numbers = [*map(unbox, value)]
+        typecode = 'q'
+
+        for number in numbers:
+            if type(number) is float:
+                typecode = 'd'
+            elif type(number) is not int:
+                throw(obj.info, obj.token, 'TypeError',
+                      f'Array items must be numbers, '
+                      f'not {type_name(number)}', line=True)
+
+        try:
+            return cls(array(typecode, numbers), env.model)
+        except OverflowError:
+            return cls(array('d', numbers), env.model)
+
+
+class RangeType(Type):
+    __slots__ = ('range', 'model')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, range, model, /):
+        self.range = range
+        self.model = model
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        if self.range.step == 1:
+            return f'range({self.range.start}, {self.range.stop})'
+        else:
+            return (f'range({self.range.start}, {self.range.stop}, '
+                    f'{self.range.step})')
+
+    # ----- Transformation Methods ----- #
+    def __bool__(self, /):
+        return True if self.range else False
+
+    # ----- Iterable Methods ----- #
+    def __len__(self, /):
+        return len(self.range)
+
+    def __getitem__(self, key, /):
+        if isinstance(key, slice):
+            return RangeType(self.range[key], self.model)
+        else:
+            return self.model.convert(self.range[key])
+
+    def __iter__(self, /):
+        return self.model.numbers(self.range)
+
+    def __contains__(self, item, /):
+        # checked arithmetically, as `range` would scan for floats
+        value = unbox(item)
+        if type(value) is float and value % 1 == 0:
+            value = int(value)
+        return type(value) is int and value in self.range
+
+
+class RegexType(Type):
+    __slots__ = ('pattern',)
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, pattern, /):
+        self.pattern = pattern
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return f'Regex({self.pattern.pattern!r})'
+
+    # ----- Transformation Methods ----- #
+    def __hash__(self, /):
+        return hash(self.pattern)
+
+    # ----- Comparison Methods ----- #
+    def __eq__(self, other, /):
+        if isinstance(other, RegexType):
+            return true if self.pattern == other.pattern else false
+        else:
+            return NotImplemented
+
+    def __ne__(self, other, /):
+        if isinstance(other, RegexType):
+            return true if self.pattern != other.pattern else false
+        else:
+            return NotImplemented
+
+    # ----- Inner Operations ----- #
+    @classmethod
+    def construct(cls, obj=None, /, *, env):
+        if obj is None:
+            return cls(compile_pattern(''))
+
+        value = unbox(obj.eval(env=env))
+
+        if isinstance(value, RegexType):
+            return value
+        elif type(value) is not str:
+            throw(obj.info, obj.token, 'TypeError',
+                  f'Regex pattern must be a String, not {type_name(value)}',
+                  line=True)
+
+        try:
+            return cls(compile_pattern(value))
+        except re_error as err:
+            throw(obj.info, obj.token, 'RegexError', f'{err}', line=True)
+
+
+class IteratorType(Type):
+    # a lazy iterator, which can only be iterated once
+    __slots__ = ('iterator', 'name')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, iterator, name='iterator', /):
+        self.iterator = iterator
+        self.name = name
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return f'<{self.name} at {id(self):#x}>'
+
+    # ----- Iterable Methods ----- #
+    def __iter__(self, /):
+        return self.iterator
+
+
 class NameType(Type):
+    __slots__ = ('id',)
+
     # ----- Initialization Methods ----- #
     def __init__(self, id, /):
         self.id = id
 
 
 class SliceType(Type):
+    __slots__ = ('start', 'stop', 'step')
+
     # ----- Initialization Methods ----- #
     def __init__(self, start, stop, step, /):
         self.start = start
@@ -521,12 +985,17 @@ class SliceType(Type):
 
 
 class ArgType(Type):
+    __slots__ = ('arg',)
+
     # ----- Initialization Methods ----- #
     def __init__(self, arg, /):
         self.arg = arg
 
 
 class ArgumentsType(Type):
+    __slots__ = ('posonlyargs', 'args', 'vararg', 'kwonlyargs', 'kw_defaults',
+                 'kwarg', 'defaults')
+
     # ----- Initialization Methods ----- #
     def __init__(self, /, *, posonlyargs=None, args=None, vararg=None,
                  kwonlyargs=None, kw_defaults=None, kwarg=None, defaults=None):
@@ -539,52 +1008,354 @@ class ArgumentsType(Type):
         self.defaults = [] if defaults is None else defaults
 
 
+class Binding:
+    # binds the arguments of the calls of a function to the slots of its
+    # frame, by a slice alone when the parameters are all `plain` positional
+    __slots__ = ('name', 'names', 'positional', 'vararg', 'kwonly', 'kwarg',
+                 'keywords', 'slots', 'blank', 'plain')
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, name, slots, /, *, posonlyargs, args, vararg,
+                 kwonlyargs, kwarg):
+        self.name = name
+        self.names = [*posonlyargs, *args]
+        self.positional = len(self.names)
+        self.vararg = None if vararg is None else slots[vararg]
+        self.kwonly = [(slots[arg], arg) for arg in kwonlyargs]
+        self.kwarg = None if kwarg is None else slots[kwarg]
+        self.keywords = {arg: slots[arg] for arg in (*args, *kwonlyargs)}
+        self.slots = slots
+        self.blank = [UNBOUND] * len(slots)
+        self.plain = vararg is None and not kwonlyargs and kwarg is None
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return f'<binding of {self.name}>'
+
+    # ----- Inner Operations ----- #
+    def bind(self, values, args, kwargs, defaults, kw_defaults, model, /):
+        # raises TypeError if the arguments don't match the parameters
+        positional, count = self.positional, len(args)
+
+        if count <= positional:
+            values[:count] = args
+        elif self.vararg is None:
+            raise TypeError(
+                f'{self.name}() takes '
+                f'{_counted(positional, "positional argument")} but '
+                f'{count} {"was" if count == 1 else "were"} given'
+            )
+        else:
+            values[:positional] = args[:positional]
+
+        if self.vararg is not None:
+            values[self.vararg] = TupleType(tuple(args[positional:]))
+
+        extra = {}
+        for name, value in kwargs.items():
+            slot = self.keywords.get(name)
+            if slot is None:
+                if self.kwarg is None:
+                    raise TypeError(f'{self.name}() got an unexpected '
+                                    f'keyword argument {name!r}')
+                extra[name] = value
+            elif values[slot] is not UNBOUND:
+                raise TypeError(f'{self.name}() got multiple values '
+                                f'for argument {name!r}')
+            else:
+                values[slot] = value
+
+        if self.kwarg is not None:
+            values[self.kwarg] = DictType(extra, model)
+
+        missing = []
+        for slot in range(count, positional):
+            if values[slot] is UNBOUND:
+                if (value := defaults[slot]) is UNBOUND:
+                    missing.append(self.names[slot])
+                values[slot] = value
+
+        if missing:
+            raise TypeError(
+                f'{self.name}() missing '
+                f'{_counted(len(missing), "required positional argument")}'
+                f': {_listed(missing)}'
+            )
+
+        for (slot, name), value in zip(self.kwonly, kw_defaults):
+            if values[slot] is UNBOUND:
+                if value is UNBOUND:
+                    missing.append(name)
+                values[slot] = value
+
+        if missing:
+            raise TypeError(
+                f'{self.name}() missing '
+                f'{_counted(len(missing), "required keyword-only argument")}'
+                f': {_listed(missing)}'
+            )
+
+
+def _counted(count, noun, /):
+    return f'{count} {noun}' if count == 1 else f'{count} {noun}s'
+
+
+def _listed(names, /):
+    names = [f'{name!r}' for name in names]
+    if len(names) <= 2:
+        return ' and '.join(names)
+    else:
+        return f'{", ".join(names[:-1])}, and {names[-1]}'
+
+
+def _typed(key, /):
+    # the key with the types of its values, which tell 1 from 1.0
+    if type(key) is tuple:
+        return tuple(map(_typed, key))
+    else:
+        return type(key), key
+
+
+class Memo:
+    # the LRU cache of a `memo` function, cleared when a variable of the
+    # module that the function reads, `reads` by slot, is rebound
+    __slots__ = ('maxsize', 'reads', 'seen', 'entries', 'hits', 'misses')
+
+    # the size of the caches of the functions declared `memo` without one
+    DEFAULT_SIZE = 4096
+
+    # ----- Initialization Methods ----- #
+    def __init__(self, maxsize=DEFAULT_SIZE, reads=(), /):
+        self.maxsize = maxsize
+        self.reads = reads
+        # the values of the variables read when the entries were stored
+        self.seen = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return (f'<memo hits={self.hits} misses={self.misses} '
+                f'size={len(self.entries)} maxsize={self.maxsize}>')
+
+    # ----- Inner Operations ----- #
+    @staticmethod
+    def key(args, kwargs, /):
+        # raises TypeError if an argument can't be hashed
+        key = (*[_typed(hash_key(value)) for value in args],
+               *[(name, _typed(hash_key(value)))
+                 for name, value in kwargs.items()])
+        # the values inside the tuples are checked as well
+        hash(key)
+        return key
+
+    def validate(self, globals, /):
+        seen = self.seen
+        if seen is not None:
+            for slot, value in zip(self.reads, seen):
+                if globals[slot] is not value:
+                    break
+            else:
+                return
+
+        self.clear()
+        self.seen = [globals[slot] for slot in self.reads]
+
+    def lookup(self, key, /):
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return UNBOUND
+
+        self.hits += 1
+        return self.entries[key]
+
+    def store(self, key, result, /):
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self, /):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
 class FunctionType(Type):
+    # `pool` keeps the frames of the calls that returned, for the next calls
+    __slots__ = ('name', 'binding', 'body', 'defaults', 'kw_defaults',
+                 'globals', 'model', 'pool', 'memo', 'qualname')
+
     # ----- Initialization Methods ----- #
-    def __init__(self, /, name=None, args=None, body=None, *, qualname=None):
-        self.name = '<anonymous>' if name is None else name
-        self.args = ArgumentsType() if args is None else args
-        self.body = [] if body is None else body
+    def __init__(self, name, binding, body, defaults, kw_defaults, globals,
+                 model, /, *, memo=None, qualname=None):
+        self.name = name
+        self.binding = binding
+        self.body = body
+        self.defaults = defaults
+        self.kw_defaults = kw_defaults
+        self.globals = globals
+        self.model = model
+        self.pool = []
+        self.memo = memo
         self.qualname = self.name if qualname is None else qualname
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
         return f'<function {self.qualname} at {id(self):#x}>'
 
-    # ----- Functional Methods ----- #
-    def __call__(self, arguments, /):
-        pass
+    # ----- Inner Operations ----- #
+    def __deepcopy__(self, memo, /):
+        # shared with their nodes, like the functions of Python
+        return self
 
 
 class BuiltinFunctionType(Type):
+    # a builtin used as a value, whose `node` builds the node of a call
+    __slots__ = ('name', 'node', 'keywords')
+
     # ----- Initialization Methods ----- #
-    def __init__(self, /):
-        self.name = '<anonymous>'
-        self.args = ArgumentsType()
+    def __init__(self, name, node, /, *, keywords=()):
+        self.name = name
+        self.node = node
+        self.keywords = keywords
 
     # ----- Informal Methods ----- #
     def __repr__(self, /):
         return f'<built-in function {self.name}>'
 
-    # ----- Functional Methods ----- #
-    def __call__(self, /):
-        pass
 
+false = object.__new__(BooleanType)
+false.value = False
+true = object.__new__(BooleanType)
+true.value = True
+none = NoneType()
+
+# interned like the small integers of CPython
+SMALL_NUMBERS = {}
+for _value in range(-5, 257):
+    SMALL_NUMBERS[_value] = object.__new__(NumberType)
+    SMALL_NUMBERS[_value].value = _value
+del _value
+
+
+# the Python types of the unboxed values and the types wrapping them
+_BOXES = {
+    bool: BooleanType,
+    int: NumberType,
+    float: NumberType,
+    str: StringType,
+}
+_WRAPPERS = frozenset(_BOXES.values())
+
+PRIMITIVE_TYPES = frozenset(_BOXES)
+
+
+def box(value, /):
+    cls = _BOXES.get(type(value))
+    return value if cls is None else cls(value)
+
+
+def unbox(value, /):
+    return value.value if type(value) in _WRAPPERS else value
+
+
+def _contains(values, item, /):
+    # `in` for the values of a tuple or a list, which keeps the unboxed
+    # booleans apart from the numbers like their wrapper types do
+    cls = type(item)
+    if cls is bool:
+        return any(value is item for value in values)
+    elif cls is int or cls is float:
+        start = 0
+        try:
+            while True:
+                start = values.index(item, start)
+                if type(values[start]) is not bool:
+                    return True
+                start += 1
+        except ValueError:
+            return False
+    else:
+        return item in values
+
+
+def hash_key(value, /):
+    # booleans are boxed so that they don't collide with 0 and 1, and tuples
+    # are tuples of the keys of their values
+    cls = type(value)
+    if cls is bool:
+        return true if value else false
+    elif cls is NumberType or cls is StringType:
+        return value.value
+    elif cls is TupleType:
+        return tuple(map(hash_key, value.values))
+    else:
+        return value
+
+
+def key_value(key, model, /):
+    # the value of a key of `hash_key`, in the value model
+    if type(key) is tuple:
+        return TupleType(tuple(key_value(item, model) for item in key))
+    else:
+        return model.convert(key)
+
+
+def type_name(value, /):
+    return _BOXES.get(type(value), type(value)).__name__
+
+
+def represent(value, /):
+    cls = type(value)
+    if cls is bool:
+        return 'true' if value else 'false'
+    elif cls is int or cls is float:
+        return _number_repr(value)
+    else:
+        return repr(value)
+
+
+def display(value, /):
+    if type(value) is str:
+        return value
+    elif type(value) in PRIMITIVE_TYPES:
+        return represent(value)
+    else:
+        return f'{value}'
+
+
+class ValueModel:
+    # `BOXED` wraps the booleans, numbers and strings, and `UNBOXED` keeps
+    # them as Python objects
+    __slots__ = ('name', 'boxed', 'true', 'false', 'one', 'convert')
 
-class PrintFunction(BuiltinFunctionType):
     # ----- Initialization Methods ----- #
-    def __init__(self, /):
-        self.name = 'print'
-        self.args = ArgumentsType()
+    def __init__(self, name, /, *, boxed, true, false, one, convert):
+        self.name = name
+        self.boxed = boxed
+        self.true = true
+        self.false = false
+        self.one = one
+        self.convert = convert
 
-    # ----- Functional Methods ----- #
-    def __call__(self, /):
-        pass
+    # ----- Informal Methods ----- #
+    def __repr__(self, /):
+        return f'<value model {self.name}>'
 
+    def __reduce__(self, /):
+        return self.name.upper()
+
+    # ----- Inner Operations ----- #
+    def numbers(self, values, /):
+        return map(NumberType, values) if self.boxed else iter(values)
 
-false = BooleanType(False)
-true = BooleanType(True)
-none = NoneType()
+
+BOXED = ValueModel('boxed', boxed=True, true=true, false=false,
+                   one=SMALL_NUMBERS[1], convert=box)
+UNBOXED = ValueModel('unboxed', boxed=False, true=True, false=False, one=1,
+                     convert=unbox)
 
 
 RESERVED = {
@@ -593,9 +1364,8 @@ RESERVED = {
     'none': none,
 }
 
-DEFAULT_ENV = {
-    # 'print': BuiltinFunctionType('print'),
-}
+# filled with the builtin functions by `ast`
+DEFAULT_ENV = {}
 
 
 CONSTRUCTOR_TYPES = {
@@ -604,4 +1374,8 @@ CONSTRUCTOR_TYPES = {
     'String': StringType,
     'Tuple': TupleType,
     'List': ListType,
+    'Dict': DictType,
+    'Set': SetType,
+    'Array': ArrayType,
+    'Regex': RegexType,
 }
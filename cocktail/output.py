@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from io import StringIO
+import sys
+from typing import Iterator, Optional, TextIO
+
+
+__all__ = ['OutputSink', 'MemorySink', 'redirect_output']
+
+
+# the number of characters buffered before they are written
+DEFAULT_SIZE = 1 << 16
+
+
+class OutputSink:
+    # buffered, and written on every line to the interactive terminals
+    __slots__ = ('file', 'size', 'parts', 'length', 'limit')
+
+    def __init__(self, file: Optional[TextIO] = None, /, *,
+                 size: int = DEFAULT_SIZE) -> None:
+        self.file = file
+        self.size = size
+        self.parts = []
+        self.length = 0
+        # decided by the first flush, for the file written to
+        self.limit = 1
+
+    def __repr__(self, /):
+        return f'<{type(self).__name__} of {self.file!r}>'
+
+    def write(self, text: str, /) -> None:
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length >= self.limit:
+            self.flush()
+
+    def flush(self, /) -> None:
+        file = sys.stdout if self.file is None else self.file
+
+        if self.parts:
+            file.write(''.join(self.parts))
+            self.parts.clear()
+            self.length = 0
+        file.flush()
+
+        self.limit = 1 if file.isatty() else self.size
+
+
+class MemorySink(OutputSink):
+    __slots__ = ()
+
+    def __init__(self, /, *, size: int = DEFAULT_SIZE) -> None:
+        super().__init__(StringIO(), size=size)
+
+    def getvalue(self, /) -> str:
+        return self.file.getvalue() + ''.join(self.parts)
+
+
+# the sink `print` writes to
+sink = OutputSink()
+
+
+@contextmanager
+def redirect_output(new: OutputSink, /) -> Iterator[OutputSink]:
+    global sink
+    old, sink = sink, new
+
+    try:
+        yield new
+    finally:
+        sink = old
+        new.flush()
@@ -1,12 +1,14 @@
 from re import match
+from typing import Optional
 from warnings import catch_warnings, filterwarnings
 
 from .rply.errors import LexingError, ParserGeneratorWarning
 from .rply.parser import LRParser
 from .rply.parsergenerator import ParserGenerator
+from .rply.token import Token
 
 from .ast import *
-from .error import throw
+from .error import throw, throw_at
 from .lexer import (
     lex,
     BIN_OP, INPLACE_OP, UNARY_OP, CMP_OP,
@@ -14,17 +16,22 @@ from .lexer import (
     TOKENS,
 )
 from .moduleinfo import ModuleInfo
+from .resolver import resolve
+from .source import Source
 from .obj import (
-    RESERVED, CONSTRUCTOR_TYPES,
-    none,
+    RESERVED, BOXED, UNBOXED,
+    Memo, ValueModel, none,
 )
 
 
-__all__ = ['Parser', 'get_parser', 'parse']
+__all__ = ['Parser', 'get_parser', 'parse_module', 'parse']
 
 
 class Parser:
+    # the syntax errors are reported in `info`, which is set to reuse the
+    # parser for other modules
     def __init__(self, /) -> None:
+        self.info: Optional[ModuleInfo] = None
         self.pg = ParserGenerator(
             TOKENS,
             precedence=[
@@ -44,10 +51,12 @@ class Parser:
                 ('left', ['STAR', 'SLASH', 'DOUBLESLASH', 'PERCENT']),
                 ('right', ['INVERT', 'UADD', 'USUB']),
                 ('left', ['DOUBLESTAR']),
+                ('left', ['LSQB', 'LPAR']),
+                ('left', ['IMPLICIT_MULT']),
             ],
         )
 
-    def add_syntaxes(self, info: ModuleInfo, /) -> None:
+    def add_syntaxes(self, /) -> None:
         @self.pg.production('program :')
         def empty_program(p):
             return Module()
@@ -72,6 +81,7 @@ class Parser:
 
         @self.pg.production('program : break_stmt SEMI program')
         @self.pg.production('program : continue_stmt SEMI program')
+        @self.pg.production('program : return_stmt SEMI program')
         def merge_stmt_to_program(p):
             return Module([p[0], *p[2].body])
 
@@ -169,148 +179,117 @@ class Parser:
             result = Continue(p[0])
             return result
 
-        @self.pg.production(
-            'func_def : FUNC NAME LPAR args_def RPAR'
-            '           LBRACE program RBRACE'
-        )
-        def func_def_stmt(p):
-            return FunctionDef(p[1].value, p[3], p[6].body)
-
-        @self.pg.production('args_def :')
-        def empty_args_def_expr(p):
-            return Arguments()
+        @self.pg.production('return_stmt : RETURN')
+        @self.pg.production('return_stmt : RETURN expr')
+        def return_stmt(p):
+            result = Return(p[1] if len(p) == 2 else None)
+            result.token = p[0]
+            return result
 
-        @self.pg.production('args_def : pos_only_args')
-        @self.pg.production('args_def : normal_args')
-        @self.pg.production('args_def : kw_only_args')
-        def single_type_args_def_expr(p):
+        @self.pg.production('func_def : function')
+        def func_def_stmt(p):
             return p[0]
 
-        @self.pg.production('args_def : pos_only_args COMMA normal_args')
-        def poa_na_args_def_expr(p):
-            return Arguments(
-                posonlyargs=p[0].posonlyargs, args=p[2].args,
-                defaults=p[0].defaults + p[2].defaults,
-            )
-
         @self.pg.production(
-            'args_def : pos_only_args COMMA kw_only_args opt_kwarg'
+            'function : FUNC NAME LPAR args_def RPAR LBRACE program RBRACE'
         )
-        def poa_koa_args_def_expr(p):
-            return Arguments(
-                posonlyargs=p[0].posonlyargs, vararg=p[2].vararg,
-                kwonlyargs=p[2].kwonlyargs, defaults=p[0].defaults,
-                kw_defaults=p[2].kw_defaults, kwarg=p[3].kwarg,
-            )
-
-        @self.pg.production(
-            'args_def : normal_args COMMA kw_only_args opt_kwarg'
-        )
-        def na_koa_args_def_expr(p):
-            return Arguments(
-                args=p[0].args, vararg=p[2].vararg, kwonlyargs=p[2].kwonlyargs,
-                defaults=p[0].defaults, kw_defaults=p[2].kw_defaults,
-                kwarg=p[3].kwarg,
-            )
-
-        @self.pg.production(
-            'args_def : pos_only_args COMMA normal_args COMMA kw_only_args'
-            '           opt_kwarg'
-        )
-        def poa_na_koa_args_def_expr(p):
-            return Arguments(
-                posonlyargs=p[0].posonlyargs, args=p[2].args,
-                vararg=p[4].vararg, kwonlyargs=p[4].kwonlyargs,
-                defaults=p[0].defaults + p[2].defaults,
-                kw_defaults=p[4].kw_defaults, kwarg=p[5].kwarg,
-            )
-
-        @self.pg.production('kw_only_args : STAR')
-        def empty_kw_only_args_expr(p):
-            return Arguments()
-
-        @self.pg.production('kw_only_args : STAR COMMA args')
-        @self.pg.production('kw_only_args : STAR COMMA kwargs')
-        def kw_only_args_expr(p):
-            return Arguments(kwonlyargs=p[2][0], kw_defaults=p[2][1])
-
-        @self.pg.production('kw_only_args : STAR COMMA args COMMA kwargs')
-        def kw_only_args_kwargs_expr(p):
-            return Arguments(
-                kwonlyargs=p[2][0] + p[4][0],
-                kw_defaults=p[2][1] + p[4][1],
-            )
-
-        @self.pg.production('kw_only_args : STAR NAME COMMA args')
-        @self.pg.production('kw_only_args : STAR NAME COMMA kwargs')
-        def kw_only_args_with_vararg_expr(p):
-            return Arguments(
-                vararg=Arg(p[1].value, p[1]),
-                kwonlyargs=p[3][0], kw_defaults=p[3][1]
-            )
-
-        @self.pg.production('kw_only_args : STAR NAME COMMA args COMMA kwargs')
-        def kw_only_args_with_vararg_kwargs_expr(p):
-            return Arguments(
-                vararg=Arg(p[1].value, p[1]),
-                kwonlyargs=p[3][0] + p[5][0], kw_defaults=p[3][1] + p[5][1],
-            )
-
-        @self.pg.production('opt_kwarg :')
-        def empty_optional_keyword_arg_expr(p):
-            return Arguments(kwarg=None)
-
-        @self.pg.production('opt_kwarg : DOUBLESTAR NAME')
-        def optional_keyword_arg_expr(p):
-            return Arguments(kwarg=Arg(p[1].value, p[1]))
+        def function_stmt(p):
+            return FunctionDef(p[1].value, p[3], p[6].body)
 
-        @self.pg.production('normal_args :')
-        def empty_normal_args_expr(p):
-            return Arguments()
+        @self.pg.production('func_def : MEMO function')
+        def memo_func_def_stmt(p):
+            p[1].memo = Memo.DEFAULT_SIZE
+            return p[1]
 
-        @self.pg.production('normal_args : args')
-        @self.pg.production('normal_args : kwargs')
-        def normal_args_expr(p):
-            return Arguments(args=p[0][0], defaults=p[0][1])
+        @self.pg.production('func_def : MEMO LPAR NUMBER RPAR function')
+        def sized_memo_func_def_stmt(p):
+            if not match(r'\d+$', p[2].value) or not int(p[2].value):
+                throw(self.info, p[2], 'SyntaxError',
+                      'memo size must be a positive integer')
+            p[4].memo = int(p[2].value)
+            return p[4]
 
-        @self.pg.production('normal_args : args COMMA kwargs')
-        def normal_args_kwargs_expr(p):
-            return Arguments(
-                args=p[0][0] + p[2][0], defaults=p[0][1] + p[2][1]
-            )
-
-        @self.pg.production('pos_only_args : SLASH')
-        def empty_pos_only_args_expr(p):
+        @self.pg.production('args_def :')
+        def empty_args_def_expr(p):
             return Arguments()
 
-        @self.pg.production('pos_only_args : args COMMA SLASH')
-        @self.pg.production('pos_only_args : kwargs COMMA SLASH')
-        def pos_only_args_expr(p):
-            return Arguments(posonlyargs=p[0][0], defaults=p[0][1])
-
-        @self.pg.production('pos_only_args : args COMMA kwargs COMMA SLASH')
-        def pos_only_args_kwargs_expr(p):
-            return Arguments(
-                posonlyargs=p[0][0] + p[2][0], defaults=p[0][1] + p[2][1]
-            )
-
-        @self.pg.production('args : NAME COMMA args')
-        def args_expr(p):
-            return [[Arg(p[0].value, p[0]), *p[2][0]], [None, *p[2][1]]]
-
-        @self.pg.production('args : NAME')
-        def single_arg_expr(p):
-            return [[Arg(p[0].value, p[0])], [None]]
-
-        @self.pg.production('kwargs : assignment COMMA kwargs')
-        def keyword_args_expr(p):
-            return [[Arg(p[0].target.id, p[0].target.token), *p[4][0]],
-                    [p[0].value, *p[4][1]]]
+        @self.pg.production('args_def : params')
+        @self.pg.production('args_def : params COMMA')
+        def args_def_expr(p):
+            return arguments(p[0])
+
+        # the list of parameters is left-recursive, so that the parser can
+        # tell the parameters from the separators by the next token
+        @self.pg.production('params : param')
+        def single_param_expr(p):
+            return [p[0]]
+
+        @self.pg.production('params : params COMMA param')
+        def params_expr(p):
+            return [*p[0], p[2]]
+
+        @self.pg.production('param : NAME')
+        def param_expr(p):
+            return ('arg', Arg(p[0].value, p[0]), None)
+
+        @self.pg.production('param : assignment')
+        def default_param_expr(p):
+            return ('arg', Arg(p[0].target.id, p[0].target.token), p[0].value)
+
+        @self.pg.production('param : SLASH')
+        @self.pg.production('param : STAR')
+        def separator_param_expr(p):
+            return (p[0].value, p[0], None)
+
+        @self.pg.production('param : STAR NAME')
+        @self.pg.production('param : DOUBLESTAR NAME')
+        def variadic_param_expr(p):
+            return (p[0].value, Arg(p[1].value, p[1]), None)
+
+        def arguments(params):
+            result = Arguments()
+            # the list the next parameters go to
+            target, defaults = result.args, result.defaults
+
+            for index, (kind, arg, default) in enumerate(params):
+                if result.kwarg is not None:
+                    throw(self.info, arg.token, 'SyntaxError',
+                          'arguments cannot follow var-keyword argument')
+
+                if kind == 'arg':
+                    if (default is None and target is not result.kwonlyargs
+                            and any(item is not None for item in defaults)):
+                        throw(self.info, arg.token, 'SyntaxError',
+                              'non-default argument follows default argument')
+                    target.append(arg)
+                    defaults.append(default)
+                elif kind == '/':
+                    if result.posonlyargs or target is not result.args:
+                        throw(self.info, arg, 'SyntaxError',
+                              "'/' must be ahead of '*'"
+                              if target is result.kwonlyargs else
+                              "'/' may appear only once")
+                    elif not result.args:
+                        throw(self.info, arg, 'SyntaxError',
+                              'at least one argument must precede /')
+                    result.posonlyargs, result.args = result.args, []
+                    target = result.args
+                elif kind == '*':
+                    if target is result.kwonlyargs:
+                        throw(self.info, getattr(arg, 'token', arg),
+                              'SyntaxError', '* argument may appear only once')
+                    elif isinstance(arg, Arg):
+                        result.vararg = arg
+                    elif (index + 1 == len(params) or
+                            params[index + 1][0] != 'arg'):
+                        throw(self.info, arg, 'SyntaxError',
+                              'named arguments must follow bare *')
+                    target = result.kwonlyargs
+                    defaults = result.kw_defaults
+                else:
+                    result.kwarg = arg
 
-        @self.pg.production('kwargs : assignment')
-        def single_keyword_arg_expr(p):
-            return [[Arg(p[0].target.id, p[0].target.token)],
-                    [p[0].value]]
+            return result
 
         @self.pg.production('expr : assignment')
         def assignment_as_expr(p):
@@ -319,7 +298,7 @@ class Parser:
         @self.pg.production('assignment : NAME EQUAL expr')
         def assignment(p):
             if p[0].value in RESERVED:
-                throw(info, p[0], 'SyntaxError',
+                throw(self.info, p[0], 'SyntaxError',
                       f'cannot assign to {p[0].value}')
             name = Name(p[0], Store())
             return Assign(name, p[2])
@@ -328,7 +307,8 @@ class Parser:
         def expr_with_parentheses(p):
             return p[1]
 
-        @self.pg.production('expr : NUMBER LPAR expr RPAR')
+        @self.pg.production('expr : NUMBER LPAR expr RPAR',
+                            precedence='IMPLICIT_MULT')
         def parentheses_number_multiplication(p):
             return BinOp(Number(p[0]), Mult, p[2])
 
@@ -336,17 +316,24 @@ class Parser:
         @self.pg.production('expr : expr LPAR tuple_expr RPAR')
         @self.pg.production('expr : expr LPAR tuple_expr COMMA RPAR')
         def function_call_expr(p):
-            args = () if len(p) == 3 else p[2].values
-
-            if isinstance(p[0], Name):
-                if p[0].token.value in BUILTIN_FUNCTIONS:
-                    return BUILTIN_FUNCTIONS[p[0].token.value](args)
-
-                elif p[0].token.value in CONSTRUCTOR_TYPES:
-                    return Construct(CONSTRUCTOR_TYPES[p[0].token.value], args)
+            args = () if len(p) == 3 else tuple(p[2].values)
+
+            # the assignments in the arguments are keyword arguments
+            positional, keywords = [], {}
+            for arg in args:
+                if isinstance(arg, Assign):
+                    if arg.target.id in keywords:
+                        throw(self.info, arg.target.token, 'SyntaxError',
+                              'keyword argument repeated')
+                    keywords[arg.target.id] = arg.value
+                elif keywords:
+                    throw(self.info, p[1], 'SyntaxError',
+                          'positional argument follows keyword argument')
+                else:
+                    positional.append(arg)
 
-            else:
-                return Call(p[0], args, {})
+            # the resolver binds the builtins that aren't assigned to
+            return Call(p[0], tuple(positional), keywords)
 
         @self.pg.production('expr : expr LSQB expr RSQB')
         def get_item_expr(p):
@@ -363,7 +350,7 @@ class Parser:
         @self.pg.production('opt_expr : ')
         @self.pg.production('opt_expr : expr')
         def optional_expr(p):
-            return p[0] if p else Constant(none)
+            return p[0] if p else Constant(Token('NAME', 'none'))
 
         @self.pg.production('expr : expr PLUS expr')
         @self.pg.production('expr : expr MINUS expr')
@@ -394,7 +381,7 @@ class Parser:
         @self.pg.production('expr : NAME VBAREQUAL expr')
         def inplace_assign_expr(p):
             if p[0].value in RESERVED:
-                throw(info, p[0], 'SyntaxError',
+                throw(self.info, p[0], 'SyntaxError',
                       f"'{p[0].value}' is an illegal expression "
                       f"for augmented assignment")
 
@@ -408,7 +395,7 @@ class Parser:
         @self.pg.production('expr : NAME MINUSMINUS')
         def inplace_unary_expr(p):
             if p[0].value in RESERVED:
-                throw(info, p[0], 'SyntaxError',
+                throw(self.info, p[0], 'SyntaxError',
                       f"'{p[0].value}' is an illegal expression "
                       f"for inplace unary operation")
 
@@ -422,7 +409,7 @@ class Parser:
         @self.pg.production('expr : MINUSMINUS NAME')
         def inplace_unary_expr(p):
             if p[1].value in RESERVED:
-                throw(info, p[0], 'SyntaxError',
+                throw(self.info, p[0], 'SyntaxError',
                       f"'{p[0].value}' is an illegal expression "
                       f"for inplace unary operation")
 
@@ -514,7 +501,7 @@ class Parser:
         @self.pg.production('expr : LPAR tuple_expr RPAR')
         @self.pg.production('expr : LPAR tuple_expr COMMA RPAR')
         def filled_tuple(p):
-            return p[1]
+            return Tuple(tuple(p[1].values))
 
         @self.pg.production('expr : LSQB RSQB')
         def empty_list(p):
@@ -525,64 +512,105 @@ class Parser:
         def filled_list(p):
             return List([*p[1].values])
 
+        @self.pg.production('expr : LBRACE RBRACE')
+        def empty_dict(p):
+            return Dict([], [])
+
+        @self.pg.production('expr : LBRACE dict_expr RBRACE')
+        @self.pg.production('expr : LBRACE dict_expr COMMA RBRACE')
+        def filled_dict(p):
+            return p[1]
+
+        @self.pg.production('expr : LBRACE tuple_expr RBRACE')
+        @self.pg.production('expr : LBRACE tuple_expr COMMA RBRACE')
+        def filled_set(p):
+            return Set([*p[1].values])
+
+        @self.pg.production('dict_expr : expr COLON expr')
+        def single_dict_expr(p):
+            return Dict([p[0]], [p[2]])
+
+        # the items are appended in place, as concatenating them would take
+        # quadratic time in the length of long literals
+        @self.pg.production('dict_expr : dict_expr COMMA expr COLON expr')
+        def multiple_dict_expr(p):
+            p[0].keys.append(p[2])
+            p[0].values.append(p[4])
+            return p[0]
+
+        # the values are a list until the tuple is complete
         @self.pg.production('tuple_expr : expr')
         def single_tuple_expr(p):
-            return Tuple((p[0],))
+            return Tuple([p[0]])
 
         @self.pg.production('tuple_expr : tuple_expr COMMA expr')
         def multiple_tuple_expr(p):
-            return Tuple(p[0].values + (p[2], ))
+            p[0].values.append(p[2])
+            return p[0]
 
         @self.pg.error
         def error_handle(token):
-            throw(info, token, 'SyntaxError', 'invalid syntax')
+            throw(self.info, token, 'SyntaxError', 'invalid syntax')
+
+    def build(self, /, *, log: str = 'default') -> LRParser:
+        # the conflicts are shown by the `log` levels 'full' and 'default'
+        if log == 'full':
+            self.add_syntaxes()
+            return self.pg.build()
+        elif log == 'default':
+            with catch_warnings(record=True) as warnings:
+                self.add_syntaxes()
+                parser = self.pg.build()
+                _show_warnings(warnings)
+            return parser
+        elif log == 'none':
+            with catch_warnings():
+                filterwarnings('ignore')
+                self.add_syntaxes()
+                return self.pg.build()
+        else:
+            raise ValueError(f"param log must be 'full', 'default', or "
+                             f"'none', not {log!r}")
 
     def get_parser(self, info: ModuleInfo, /) -> LRParser:
-        self.add_syntaxes(info)
+        self.info = info
+        self.add_syntaxes()
         return self.pg.build()
 
 
+def _show_warnings(warnings, /) -> None:
+    # the unused tokens are shown together
+    warning_unused = True
+    unused_tokens = []
+
+    for warning in warnings:
+        if warning.category is not ParserGeneratorWarning:
+            continue
+
+        if warning_unused and (result := match(
+            r"^Token '(.+)' is unused$", f'{warning.message}'
+        )):
+            unused_tokens.append(result.group(1))
+        else:
+            if warning_unused:
+                warning_unused = False
+                if len(unused_tokens) == 1:
+                    print(f"\x1b[91mParserGeneratorWarning: "
+                          f"Token '{unused_tokens}' is unused\x1b[0m")
+                elif len(unused_tokens) > 1:
+                    token_string = ', '.join(
+                        f"'{token}'" for token in unused_tokens
+                    )
+                    print(f"\x1b[91mParserGeneratorWarning: "
+                          f"Token {token_string} are unused\x1b[0m")
+            print(f'\x1b[91mParserGeneratorWarning: '
+                  f'{warning.message}\x1b[0m')
+
+
 def get_parser(info: ModuleInfo, /, *, log: str = 'default') -> LRParser:
-    if log == 'full':
-        return Parser().get_parser(info)
-    elif log == 'default':
-        with catch_warnings(record=True) as warnings:
-            parser = Parser().get_parser(info)
-
-            warning_unused = True
-            unused_tokens = []
-
-            for warning in warnings:
-                if warning.category is not ParserGeneratorWarning:
-                    continue
-
-                if warning_unused and (result := match(
-                    r"^Token '(.+)' is unused$", f'{warning.message}'
-                )):
-                    unused_tokens.append(result.group(1))
-                else:
-                    if warning_unused:
-                        warning_unused = False
-                        if len(unused_tokens) == 1:
-                            print(f"\x1b[91mParserGeneratorWarning: "
-                                  f"Token '{unused_tokens}' is unused\x1b[0m")
-                        elif len(unused_tokens) > 1:
-                            token_string = ', '.join(
-                                f"'{token}'" for token in unused_tokens
-                            )
-                            print(f"\x1b[91mParserGeneratorWarning: "
-                                  f"Token {token_string} are unused\x1b[0m")
-                    print(f'\x1b[91mParserGeneratorWarning: '
-                          f'{warning.message}\x1b[0m')
-
-        return parser
-    elif log == 'none':
-        with catch_warnings():
-            filterwarnings('ignore')
-            return Parser().get_parser(info)
-    else:
-        raise ValueError(f"param log must be 'full', 'default', or 'none', "
-                         f"not {log!r}")
+    parser = Parser()
+    parser.info = info
+    return parser.build(log=log)
 
 
 def informed(node: Ast, info: ModuleInfo) -> Ast:
@@ -590,38 +618,51 @@ def informed(node: Ast, info: ModuleInfo) -> Ast:
         raise ValueError('cannot inform a node of None')
 
     node.info = info
+    token = None
     for field in node._fields:
         value = getattr(node, field)
         if isinstance(value, Ast):
             setattr(node, field, informed(value, info))
         elif isinstance(value, list):
-            setattr(node, field, [informed(item, info) for item in value])
+            # the defaults of the arguments are None where there are none
+            setattr(node, field, [None if item is None
+                                  else informed(item, info)
+                                  for item in value])
         elif isinstance(value, tuple):
             setattr(node, field, tuple(informed(item, info) for item in value))
+        elif isinstance(value, dict):
+            setattr(node, field, {key: informed(item, info)
+                                  for key, item in value.items()})
+
+        if token is None:
+            for item in (value if isinstance(value, (list, tuple))
+                         else (value,)):
+                if isinstance(item, Token):
+                    token = item
+                elif isinstance(item, Ast):
+                    token = getattr(item, 'token', None)
+                if token is not None:
+                    break
+
+    # nodes without a token of their own report the position of their
+    # first child that has one
+    if not hasattr(node, 'token') and token is not None:
+        node.token = token
     return node
 
 
-def parse(source: str, *, path: str = '<unknown>',
-          log: str = 'default') -> Module:
-    tokens = lex(source)
-
-    info = ModuleInfo(source, path)
-
-    parser = get_parser(info, log=log)
-
+def parse_module(parser: LRParser, info: ModuleInfo, /, *,
+                 model: ValueModel = BOXED) -> Module:
     try:
-        module = parser.parse(tokens)
+        module = parser.parse(lex(info.source))
     except LexingError as err:
-        index = err.source_pos.idx
-        lineno = source[:index].count('\n')
-        line = source.split('\n')[lineno]
-        if '\n' in source[:index]:
-            padding = (index - source[:index].rfind('\n')) * ' '
-        else:
-            padding = index * ' '
-        exit(f'  File "{path}", line {lineno + 1}\n'
-             f'    {line}\n'
-             f'   {padding}^\n'
-             f'SyntaxError: invalid syntax')
+        throw_at(info, err.source_pos.idx, 'SyntaxError', 'invalid syntax')
+
+    return resolve(informed(module, info), model=model)
 
-    return informed(module, info)
+
+def parse(source: Source, *, path: str = '<unknown>',
+          log: str = 'default', unboxed: bool = False) -> Module:
+    info = ModuleInfo(source, path)
+    return parse_module(get_parser(info, log=log), info,
+                        model=UNBOXED if unboxed else BOXED)
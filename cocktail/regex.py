@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from re import Pattern, compile as re_compile
+
+
+__all__ = ['PatternCache', 'PATTERNS', 'compile_pattern']
+
+
+class PatternCache:
+    # an LRU cache, as the one of `re` is shared and checks the arguments on
+    # every lookup
+    __slots__ = ('maxsize', 'patterns')
+
+    def __init__(self, maxsize: int = 1024, /) -> None:
+        self.maxsize = maxsize
+        self.patterns: OrderedDict[str, Pattern] = OrderedDict()
+
+    def __repr__(self, /):
+        return f'<pattern cache {len(self.patterns)}/{self.maxsize}>'
+
+    def compile(self, pattern: str, /) -> Pattern:
+        try:
+            self.patterns.move_to_end(pattern)
+        except KeyError:
+            compiled = self.patterns[pattern] = re_compile(pattern)
+            if len(self.patterns) > self.maxsize:
+                self.patterns.popitem(last=False)
+            return compiled
+
+        return self.patterns[pattern]
+
+    def resize(self, maxsize: int, /) -> None:
+        if maxsize < 1:
+            raise ValueError('the size of the cache must be positive')
+
+        self.maxsize = maxsize
+        while len(self.patterns) > maxsize:
+            self.patterns.popitem(last=False)
+
+    def clear(self, /) -> None:
+        self.patterns.clear()
+
+
+# the cache of the regular expressions of the programs
+PATTERNS = PatternCache()
+
+
+def compile_pattern(pattern: str, /) -> Pattern:
+    return PATTERNS.compile(pattern)
@@ -0,0 +1,359 @@
+from typing import Dict, List, Optional, Set, Union
+
+from .ast import (
+    Add, Arg, Assign, Ast, AugAssign, BinOp, Break, Call, Compare, Constant,
+    Construct, Continue, For, ForOf, FunctionDef, FunctionStmt, Global,
+    GlobalName, Gt, GtE, If, InplaceUnaryOp, Lt, LtE, Module, Name, Nonlocal,
+    Number, PostIncrement, PreIncrement, Return, String, Sub, UAdd, UnaryOp,
+    USub, While,
+)
+from .error import throw
+from .obj import BOXED, DEFAULT_ENV, Binding, ValueModel, unbox
+
+
+__all__ = ['Resolver', 'resolve']
+
+
+class Resolver:
+    # assigns the variables the slots of their frames, and marks the tail
+    # calls, the jumps of the loops and the steps of the counted loops
+    def __init__(self, /, *, model: ValueModel = BOXED,
+                 parent: Optional['Resolver'] = None) -> None:
+        self.model = model
+        self.loops = 0
+        self.parent = parent
+
+        if parent is None:
+            self.module = self
+            self.slots: Dict[str, int] = {name: index for index, name
+                                          in enumerate(DEFAULT_ENV)}
+        else:
+            self.module = parent.module
+            self.slots = {}
+
+    def slot(self, name: str, /) -> int:
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+        return self.slots[name]
+
+    def visit(self, node, /) -> None:
+        if isinstance(node, Ast):
+            getattr(self, f'visit_{type(node).__name__}',
+                    self.generic_visit)(node)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                self.visit(item)
+        elif isinstance(node, dict):
+            for item in node.values():
+                self.visit(item)
+
+    def generic_visit(self, node: Ast, /) -> None:
+        for field in node._fields:
+            self.visit(getattr(node, field, None))
+
+    def visit_Module(self, node: Module, /) -> None:
+        _bind_builtins(node, _assigned(node, set()))
+        self.generic_visit(node)
+        node.slots = self.slots
+        node.model = self.model
+
+    def visit_Name(self, node: Name, /) -> None:
+        if self.parent is None or node.id in self.slots:
+            node.slot = self.slot(node.id)
+            return
+
+        scope = self.parent
+        while scope.parent is not None:
+            if node.id in scope.slots:
+                throw(node.info, node.token, 'SyntaxError',
+                      f"cannot use '{node.id}' of the function around, "
+                      f"closures are not supported")
+            scope = scope.parent
+
+        node.slot = self.module.slot(node.id)
+        node.__class__ = GlobalName
+
+    def visit_FunctionDef(self, node: FunctionDef, /) -> None:
+        node.slot = self.slot(node.name)
+
+        # the defaults are evaluated where the function is defined
+        args = node.args
+        self.visit(args.defaults)
+        self.visit(args.kw_defaults)
+
+        scope = Resolver(model=self.model, parent=self)
+        params = [*args.posonlyargs, *args.args, args.vararg,
+                  *args.kwonlyargs, args.kwarg]
+        for param in params:
+            if param is None:
+                continue
+            elif param.arg in scope.slots:
+                throw(node.info, param.token, 'SyntaxError',
+                      f"duplicate argument '{param.arg}' "
+                      f"in function definition")
+            scope.slot(param.arg)
+
+        for name in sorted(_stored(node.body, set())):
+            scope.slot(name)
+
+        scope.visit(node.body)
+        if node.memo is not None:
+            node.reads = tuple(sorted(_globals_read(node.body, set())))
+
+        node.binding = Binding(
+            node.name, scope.slots,
+            posonlyargs=[arg.arg for arg in args.posonlyargs],
+            args=[arg.arg for arg in args.args],
+            vararg=None if args.vararg is None else args.vararg.arg,
+            kwonlyargs=[arg.arg for arg in args.kwonlyargs],
+            kwarg=None if args.kwarg is None else args.kwarg.arg,
+        )
+
+    def visit_If(self, node: If, /) -> None:
+        self.generic_visit(node)
+        node.jumps = _jumps(node.body) or _jumps(node.orelse)
+
+    def visit_For(self, node: Union[For, ForOf, While], /) -> None:
+        for field in node._fields:
+            if field != 'body':
+                self.visit(getattr(node, field))
+
+        self.loops += 1
+        self.visit(node.body)
+        self.loops -= 1
+
+        node.jumps = _jumps(node.body)
+        if isinstance(node, For):
+            node.step = _step(node)
+
+    visit_ForOf = visit_While = visit_For
+
+    def visit_Break(self, node: Union[Break, Continue], /) -> None:
+        if not self.loops:
+            throw(node.info, node.token, 'SyntaxError',
+                  f"cannot use '{type(node).__name__.lower()}'"
+                  f" outside loop")
+
+    visit_Continue = visit_Break
+
+    def visit_FunctionStmt(self, node: FunctionStmt, /) -> None:
+        # the bodies of the functions are not visited
+        throw(node.info, node.token, 'SyntaxError',
+              f"cannot use '{type(node).__name__.lower()}'"
+              f" outside function definition")
+
+    def visit_Global(self, node: Global, /) -> None:
+        if self.parent is None:
+            self.visit_FunctionStmt(node)
+
+        # the functions read the variables of the module without declaring
+        # them, but the ones they assign are their own
+        for name in node.names:
+            if name.id in self.slots:
+                throw(node.info, name.token, 'SyntaxError',
+                      f"name '{name.id}' is local and global")
+        self.generic_visit(node)
+
+    def visit_Nonlocal(self, node: Nonlocal, /) -> None:
+        if self.parent is None:
+            self.visit_FunctionStmt(node)
+
+        throw(node.info, node.token, 'SyntaxError',
+              "cannot use 'nonlocal', closures are not supported")
+
+    def visit_Return(self, node: Return, /) -> None:
+        if self.parent is None:
+            self.visit_FunctionStmt(node)
+        self.generic_visit(node)
+        node.tail = isinstance(node.value, Call)
+
+    def visit_Constant(self, node: Constant, /) -> None:
+        node.value = self.model.convert(node.value)
+
+    visit_Number = visit_String = visit_Constant
+
+
+def _jumps(body: List[Ast], /) -> bool:
+    # whether the block may break, continue or return
+    for stmt in body:
+        if isinstance(stmt, (Break, Continue, Return)):
+            return True
+        elif isinstance(stmt, If) and stmt.jumps:
+            return True
+        elif (isinstance(stmt, (For, ForOf, While)) and
+                (_jumps(stmt.orelse) or _returns(stmt.body))):
+            return True
+
+    return False
+
+
+def _returns(body: List[Ast], /) -> bool:
+    # whether a statement of the block may return from the function
+    for stmt in body:
+        if isinstance(stmt, Return):
+            return True
+        elif (isinstance(stmt, (If, For, ForOf, While)) and
+                (_returns(stmt.body) or _returns(stmt.orelse))):
+            return True
+
+    return False
+
+
+def _stored(node, names: Set[str], /) -> Set[str]:
+    # collects the names of the variables assigned in the nodes
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            _stored(item, names)
+    elif isinstance(node, Ast):
+        if isinstance(node, (Assign, AugAssign, InplaceUnaryOp, ForOf)):
+            names.add(node.target.id)
+        elif isinstance(node, FunctionDef):
+            # the variables of the function are its own
+            names.add(node.name)
+            return names
+
+        for field in node._fields:
+            _stored(getattr(node, field, None), names)
+
+    return names
+
+
+def _assigned(node, names: Set[str], /) -> Set[str]:
+    # collects the names assigned anywhere in the module, functions included
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            _assigned(item, names)
+    elif isinstance(node, dict):
+        _assigned([*node.values()], names)
+    elif isinstance(node, Ast):
+        if isinstance(node, (Assign, AugAssign, InplaceUnaryOp, ForOf)):
+            names.add(node.target.id)
+        elif isinstance(node, FunctionDef):
+            names.add(node.name)
+        elif isinstance(node, Arg):
+            names.add(node.arg)
+
+        for field in node._fields:
+            _assigned(getattr(node, field, None), names)
+
+    return names
+
+
+def _builtin_call(node: Call, /) -> Ast:
+    # the node of a call of a builtin function or constructor by its name
+    name = node.name.id
+    builtin = DEFAULT_ENV[name]
+
+    for keyword in node.kwargs:
+        if keyword not in builtin.keywords:
+            throw(node.info, node.name.token, 'TypeError',
+                  f'{name}() takes no keyword arguments'
+                  if not builtin.keywords else
+                  f"{name}() got an unexpected keyword argument "
+                  f"'{keyword}'")
+
+    result = builtin.node(node.args, node.kwargs)
+    result.info = node.info
+    if not isinstance(result, Construct):
+        result.token = node.name.token
+    elif node.args:
+        result.token = node.args[0].token
+    return result
+
+
+def _bind_builtins(node: Ast, assigned: Set[str], /) -> None:
+    # replaces the calls of the builtins by their names with their nodes,
+    # unless the module assigns the names anywhere
+    def bound(value):
+        if isinstance(value, Ast):
+            if (type(value) is Call and type(value.name) is Name and
+                    value.name.id in DEFAULT_ENV and
+                    value.name.id not in assigned):
+                value = _builtin_call(value)
+            _bind_builtins(value, assigned)
+        elif isinstance(value, list):
+            value = [bound(item) for item in value]
+        elif isinstance(value, tuple):
+            value = tuple(bound(item) for item in value)
+        elif isinstance(value, dict):
+            value = {key: bound(item) for key, item in value.items()}
+        return value
+
+    for field in node._fields:
+        setattr(node, field, bound(getattr(node, field, None)))
+
+
+def _globals_read(node, slots: Set[int], /) -> Set[int]:
+    # collects the slots of the variables of the module used in the nodes
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            _globals_read(item, slots)
+    elif isinstance(node, dict):
+        _globals_read([*node.values()], slots)
+    elif isinstance(node, Ast):
+        if isinstance(node, GlobalName):
+            slots.add(node.slot)
+
+        for field in node._fields:
+            _globals_read(getattr(node, field, None), slots)
+
+    return slots
+
+
+def _invariant(node: Ast, stored: Set[str], /) -> bool:
+    # whether the expression has the same value on every iteration
+    if isinstance(node, (Number, String, Constant)):
+        return True
+    elif isinstance(node, Name):
+        return node.id not in stored
+    elif isinstance(node, BinOp):
+        return (_invariant(node.left, stored) and
+                _invariant(node.right, stored))
+    elif isinstance(node, UnaryOp):
+        return (isinstance(node.op, (UAdd, USub)) and
+                _invariant(node.operand, stored))
+    else:
+        return False
+
+
+def _step(node: For, /) -> Optional[int]:
+    # the step of `for (i = a; i < b; i++)` and the like, or None
+    init, cond, loop = node.init, node.cond, node.loop
+
+    if not (isinstance(init, Assign) and isinstance(cond, Compare)):
+        return None
+
+    name = init.target.id
+    if not (len(cond.ops) == 1 and isinstance(cond.left, Name) and
+            cond.left.id == name):
+        return None
+
+    if (isinstance(loop, InplaceUnaryOp) and loop.target.id == name):
+        step = 1 if isinstance(loop.op, (PostIncrement, PreIncrement)) else -1
+    elif (isinstance(loop, AugAssign) and loop.target.id == name and
+            isinstance(loop.op, (Add, Sub)) and
+            isinstance(loop.value, Number) and
+            type(literal := unbox(loop.value.value)) is int and literal):
+        step = literal if isinstance(loop.op, Add) else -literal
+    else:
+        return None
+
+    if isinstance(cond.ops[0], (Lt, LtE)):
+        if step < 0:
+            return None
+    elif isinstance(cond.ops[0], (Gt, GtE)):
+        if step > 0:
+            return None
+    else:
+        return None
+
+    stored = _stored(node.body, set())
+    if name in stored or not _invariant(cond.comparators[0], stored):
+        return None
+
+    return step
+
+
+def resolve(module: Module, /, *, model: ValueModel = BOXED) -> Module:
+    Resolver(model=model).visit(module)
+    return module
@@ -11,7 +11,7 @@ except ImportError:
     def we_are_translated():
         return False
 
-from rply.lexer import Lexer
+from .lexer import Lexer
 
 
 class Rule:
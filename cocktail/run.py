@@ -1,13 +1,18 @@
-from typing import Iterator
+from mmap import mmap
+from typing import Iterator, Optional
 
 from .rply import Token
 from .rply.errors import LexingError
 
+from .error import throw_at
 from .lexer import lex
+from .moduleinfo import ModuleInfo
+from .output import OutputSink, redirect_output
 from .parser import parse
+from .source import Source, map_source
 
 
-__all__ = ['tokenize', 'execute']
+__all__ = ['tokenize', 'execute', 'execute_file']
 
 
 def tokenize(source: str, /, *, path: str = '<unknown>') -> Iterator[Token]:
@@ -15,19 +20,34 @@ def tokenize(source: str, /, *, path: str = '<unknown>') -> Iterator[Token]:
         for token in lex(source):
             yield token
     except LexingError as err:
-        index = err.source_pos.idx
-        lineno = source[:index].count('\n')
-        line = source.split('\n')[lineno]
-        if '\n' in source[:index]:
-            padding = (index - source[:index].rfind('\n')) * ' '
-        else:
-            padding = index * ' '
-        exit(f'  File "{path}", line {lineno + 1}\n'
-             f'    {line}\n'
-             f'   {padding}^\n'
-             f'SyntaxError: invalid syntax')
-
-
-def execute(source: str, /,
-            *, path: str = '<unknown>', log: str = 'default') -> None:
-    parse(source, path=path, log=log).eval()
+        throw_at(ModuleInfo(source, path), err.source_pos.idx, 'SyntaxError',
+                 'invalid syntax')
+
+
+def execute(source: Source, /, *, path: str = '<unknown>',
+            log: str = 'default', unboxed: bool = False,
+            output: Optional[OutputSink] = None,
+            recursion_limit: Optional[int] = None) -> None:
+    module = parse(source, path=path, log=log, unboxed=unboxed)
+
+    if output is None:
+        module.eval(recursion_limit=recursion_limit)
+    else:
+        with redirect_output(output):
+            module.eval(recursion_limit=recursion_limit)
+
+
+def execute_file(path: str, /, *, log: str = 'default', unboxed: bool = False,
+                 output: Optional[OutputSink] = None,
+                 recursion_limit: Optional[int] = None) -> None:
+    # the file is memory-mapped and lexed as bytes
+    source = map_source(path)
+
+    # the tokens of the module refer to the mapping until it has run, for
+    # the error reports, and the module isn't kept after that
+    try:
+        execute(source, path=path, log=log, unboxed=unboxed, output=output,
+                recursion_limit=recursion_limit)
+    finally:
+        if type(source) is mmap:
+            source.close()
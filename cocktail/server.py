@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+from io import StringIO
+from json import dumps, loads
+from os import unlink
+import socket
+# the Unix sockets are looked up when used, as some systems have none
+import socketserver
+import sys
+from time import perf_counter
+from typing import Iterator, Optional, TextIO, Tuple
+
+from .error import CocktailError
+from .interpreter import Interpreter
+from .output import MemorySink
+
+
+__all__ = ['Server', 'Client']
+
+
+@contextmanager
+def _redirect_stdio(stdin: TextIO, stdout: TextIO, /) -> Iterator[None]:
+    # `input` and `lines` read from `sys.stdin`, and `input` writes its
+    # prompt to `sys.stdout`
+    old_stdin, old_stdout = sys.stdin, sys.stdout
+    sys.stdin, sys.stdout = stdin, stdout
+
+    try:
+        yield
+    finally:
+        sys.stdin, sys.stdout = old_stdin, old_stdout
+
+
+def _response(status: int, output: str = '', error: Optional[str] = None,
+              times: Optional[dict] = None, /) -> dict:
+    return {'status': status, 'output': output, 'error': error,
+            'times': times}
+
+
+class Server:
+    # runs the JSON-lines requests one after another with one interpreter
+    def __init__(self, interpreter: Optional[Interpreter] = None, /) -> None:
+        if interpreter is None:
+            interpreter = Interpreter()
+        self.interpreter = interpreter
+
+    def __repr__(self, /):
+        return f'<Server of {self.interpreter!r}>'
+
+    def handle(self, request: dict, /) -> dict:
+        if not isinstance(request, dict):
+            return _response(2, '', 'the request must be an object')
+
+        path = request.get('path')
+        source = request.get('source')
+        stdin = request.get('stdin', '')
+
+        if (path is None) == (source is None):
+            return _response(2, '', "the request must have either 'path' "
+                                    "or 'source'")
+        elif not isinstance(path if source is None else source, str):
+            return _response(2, '', "'path' and 'source' must be strings")
+        elif not isinstance(stdin, str):
+            return _response(2, '', "'stdin' must be a string")
+
+        output = MemorySink()
+        times = {'parse': 0.0, 'run': 0.0}
+        with _redirect_stdio(StringIO(stdin), output.file):
+            status, error = self._run(path, source, output, times)
+
+        return _response(status, output.getvalue(), error, times)
+
+    def _run(self, path: Optional[str], source: Optional[str],
+             output: MemorySink, times: dict, /) -> Tuple[int, Optional[str]]:
+        try:
+            start = perf_counter()
+            try:
+                if source is None:
+                    module = self.interpreter.load(path)
+                else:
+                    module = self.interpreter.compile(source)
+            finally:
+                times['parse'] = perf_counter() - start
+
+            start = perf_counter()
+            try:
+                self.interpreter.execute(module, output=output)
+            finally:
+                times['run'] = perf_counter() - start
+        except CocktailError as err:
+            return 1, f'{err}'
+        except OSError as err:
+            return 1, f'{path}: {err.strerror}'
+        except Exception as err:
+            # like the end of the input, which `input` fails at
+            return 1, f'{type(err).__name__}: {err}'
+
+        return 0, None
+
+    def handle_line(self, line: str, /) -> str:
+        try:
+            request = loads(line)
+        except ValueError as err:
+            response = _response(2, '', f'invalid JSON: {err}')
+        else:
+            response = self.handle(request)
+
+        return f'{dumps(response)}\n'
+
+    def serve_stream(self, infile: TextIO, outfile: TextIO, /) -> None:
+        for line in infile:
+            if line.strip():
+                outfile.write(self.handle_line(line))
+                outfile.flush()
+
+    def serve_socket(self, address: str, /) -> None:
+        # the socket file is removed when the server stops
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self, /) -> None:
+                for line in self.rfile:
+                    if line.strip():
+                        response = server.handle_line(line.decode())
+                        self.wfile.write(response.encode())
+                        self.wfile.flush()
+
+        with socketserver.UnixStreamServer(address, Handler) as unix_server:
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                unlink(address)
+
+
+class Client:
+    def __init__(self, address: str, /) -> None:
+        self.address = address
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.socket.connect(address)
+        except OSError:
+            self.socket.close()
+            raise
+        self.file = self.socket.makefile('rwb')
+
+    def __repr__(self, /):
+        return f'<Client of {self.address!r}>'
+
+    def __enter__(self, /) -> 'Client':
+        return self
+
+    def __exit__(self, /, *exc_info) -> None:
+        self.close()
+
+    def request(self, /, *, path: Optional[str] = None,
+                source: Optional[str] = None, stdin: str = '') -> dict:
+        request = {'stdin': stdin}
+        if path is not None:
+            request['path'] = path
+        if source is not None:
+            request['source'] = source
+
+        self.file.write(f'{dumps(request)}\n'.encode())
+        self.file.flush()
+
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError('the server closed the connection')
+        return loads(line)
+
+    def close(self, /) -> None:
+        self.file.close()
+        self.socket.close()
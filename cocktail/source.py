@@ -0,0 +1,51 @@
+from mmap import ACCESS_READ, mmap
+from typing import Tuple, Union
+
+
+__all__ = [
+    'Source', 'map_source', 'source_line', 'source_column', 'source_position',
+]
+
+
+# the sources are strings, or the bytes of memory-mapped files
+Source = Union[str, bytes, mmap]
+
+
+def map_source(path: str, /) -> Union[bytes, mmap]:
+    with open(path, 'rb') as file:
+        try:
+            return mmap(file.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            return b''
+
+
+def source_line(source: Source, lineno: int, /) -> str:
+    # only the lines before it are scanned
+    newline = '\n' if isinstance(source, str) else b'\n'
+
+    start = 0
+    for _ in range(lineno - 1):
+        start = source.find(newline, start) + 1
+        if not start:
+            return ''
+
+    end = source.find(newline, start)
+    line = source[start:] if end < 0 else source[start:end]
+    return line if isinstance(line, str) else line.decode(errors='replace')
+
+
+def source_column(source: Source, index: int, /) -> int:
+    # the indices of the sources in bytes are the ones of their bytes
+    newline = '\n' if isinstance(source, str) else b'\n'
+
+    prefix = source[source.rfind(newline, 0, index) + 1:index]
+    if not isinstance(prefix, str):
+        prefix = prefix.decode(errors='replace')
+
+    return len(prefix) + 1
+
+
+def source_position(source: Source, index: int, /) -> Tuple[int, int]:
+    newline = '\n' if isinstance(source, str) else b'\n'
+    return source[:index].count(newline) + 1, source_column(source, index)
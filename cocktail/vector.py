@@ -0,0 +1,176 @@
+from array import array
+from itertools import repeat
+from operator import (
+    add, eq, floordiv, ge, gt, le, lt, mod, mul, ne, pow, sub, truediv,
+)
+from typing import Callable, Dict, Tuple, Union
+
+try:
+    import numpy
+except (ImportError, ModuleNotFoundError):
+    numpy = None
+
+from .dispatch import register_binary, register_compare
+from .obj import ArrayType, NumberType, type_name, unbox
+
+
+__all__ = ['elementwise', 'reduction']
+
+
+# operator symbol -> (Python function, NumPy function name)
+ELEMENTWISE: Dict[str, Tuple[Callable, str]] = {
+    '+': (add, 'add'),
+    '-': (sub, 'subtract'),
+    '*': (mul, 'multiply'),
+    '/': (truediv, 'true_divide'),
+    '//': (floordiv, 'floor_divide'),
+    '%': (mod, 'mod'),
+    '**': (pow, 'power'),
+    '==': (eq, 'equal'),
+    '!=': (ne, 'not_equal'),
+    '<': (lt, 'less'),
+    '<=': (le, 'less_equal'),
+    '>': (gt, 'greater'),
+    '>=': (ge, 'greater_equal'),
+}
+
+COMPARISONS = {'==', '!=', '<', '<=', '>', '>='}
+
+Operand = Union[ArrayType, int, float]
+
+
+def _typecode(op: str, left, right, /) -> str:
+    # the comparisons give 0 and 1, true division always gives floats
+    if op in COMPARISONS:
+        return 'b'
+    elif op == '/':
+        return 'd'
+
+    for operand in (left, right):
+        if isinstance(operand, ArrayType):
+            if operand.typecode == 'd':
+                return 'd'
+        elif type(operand) is float:
+            return 'd'
+
+    return 'q'
+
+
+# the bounds of the integer operands of which the results fit in 64 bits,
+# as NumPy wraps the integers around silently
+_INTEGER_BOUNDS = {'+': 2 ** 62, '-': 2 ** 62, '*': 2 ** 31}
+
+
+def _fits(op: str, operands, /) -> bool:
+    bound = _INTEGER_BOUNDS.get(op)
+    if bound is None:
+        return op != '**'
+
+    for operand in operands:
+        if isinstance(operand, numpy.ndarray):
+            if len(operand) and not (-bound < operand.min() and
+                                     operand.max() < bound):
+                return False
+        elif not -bound < operand < bound:
+            return False
+
+    return True
+
+
+def _elementwise_numpy(op: str, left, right, typecode: str, /):
+    operands = [numpy.asarray(operand.values)
+                if isinstance(operand, ArrayType) else operand
+                for operand in (left, right)]
+
+    if typecode == 'q' and not _fits(op, operands):
+        raise OverflowError
+
+    with numpy.errstate(all='raise'):
+        result = getattr(numpy, ELEMENTWISE[op][1])(*operands)
+
+    return array(typecode, result.astype(typecode).tobytes())
+
+
+def _elementwise_python(op: str, left, right, typecode: str, /):
+    func = ELEMENTWISE[op][0]
+    operands = [operand.values if isinstance(operand, ArrayType)
+                else repeat(operand) for operand in (left, right)]
+
+    try:
+        return array(typecode, map(func, *operands))
+    except (OverflowError, TypeError):
+        # integers too large for 64 bits, or negative powers
+        if typecode != 'q':
+            raise
+        return array('d', map(func, *operands))
+
+
+def elementwise(op: str, left: Operand, right: Operand, /) -> ArrayType:
+    # through NumPy when it is importable and accepts the operands
+    left, right = unbox(left), unbox(right)
+    model = (left if isinstance(left, ArrayType) else right).model
+
+    if (isinstance(left, ArrayType) and isinstance(right, ArrayType) and
+            len(left) != len(right)):
+        raise ValueError(f'operands could not be broadcast together '
+                         f'with lengths {len(left)} and {len(right)}')
+
+    typecode = _typecode(op, left, right)
+
+    if numpy is not None:
+        try:
+            return ArrayType(_elementwise_numpy(op, left, right, typecode),
+                             model)
+        except (ArithmeticError, OverflowError, TypeError, ValueError):
+            # raised again with the messages of Python by the fallback
+            pass
+
+    return ArrayType(_elementwise_python(op, left, right, typecode), model)
+
+
+def reduction(name: str, value, /) -> Union[int, float]:
+    if isinstance(value, ArrayType):
+        numbers = value.values
+        if numpy is not None and len(numbers):
+            values = numpy.asarray(numbers)
+            if value.typecode == 'd' or name == 'min' or name == 'max':
+                return getattr(values, name)().item()
+
+            # the integer sums are only taken by NumPy if they can't wrap
+            # around, and the means are divided from them like in Python
+            bound = 2 ** 63 // len(numbers)
+            if -bound < values.min() and values.max() < bound:
+                total = values.sum().item()
+                return total if name == 'sum' else total / len(numbers)
+    else:
+        numbers = [*map(unbox, value)]
+        for number in numbers:
+            if type(number) is not int and type(number) is not float:
+                raise TypeError(f"unsupported operand type for {name}: "
+                                f"'{type_name(number)}'")
+
+    if name == 'sum':
+        return sum(numbers)
+    elif not len(numbers):
+        raise ValueError(f'{name} of an empty sequence')
+    elif name == 'mean':
+        return sum(numbers) / len(numbers)
+    else:
+        return (min if name == 'min' else max)(numbers)
+
+
+def _register(op: str, /) -> None:
+    def func(left, right, /):
+        return elementwise(op, left, right)
+
+    register = register_compare if op in COMPARISONS else register_binary
+    for other in (ArrayType, NumberType, int, float):
+        register(op, ArrayType, other, func)
+        if other is not ArrayType:
+            register(op, other, ArrayType, func)
+
+
+for _op in ELEMENTWISE:
+    _register(_op)
+
+del _op
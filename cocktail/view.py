@@ -0,0 +1,67 @@
+from collections.abc import Sequence
+from typing import Iterator, Union
+
+
+__all__ = ['SliceView', 'slice_of']
+
+
+# slices shorter than this are copied, as that is as cheap as a view
+_VIEW_THRESHOLD = 32
+
+# slices of less than a fourth of their base are copied, so that the views
+# don't keep large bases alive for a few items
+_SPARSENESS = 4
+
+
+def _as_slice(indices: range, /) -> slice:
+    # a stop of -1 means before the first item for a range, but the last
+    # item for a slice
+    return slice(indices.start, None if indices.stop < 0 else indices.stop,
+                 indices.step)
+
+
+class SliceView(Sequence):
+    # the views of views refer to the original base
+    __slots__ = ('base', 'indices')
+
+    def __init__(self, base: Union[list, tuple, str], indices: range, /):
+        self.base = base
+        self.indices = indices
+
+    def __repr__(self, /):
+        return f'SliceView({self.materialize()!r})'
+
+    def __len__(self, /) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, key, /):
+        if isinstance(key, slice):
+            return slice_of(self, key)
+        else:
+            return self.base[self.indices[key]]
+
+    def __iter__(self, /) -> Iterator:
+        return map(self.base.__getitem__, self.indices)
+
+    def __add__(self, other, /):
+        return self.materialize() + other
+
+    def __radd__(self, other, /):
+        return other + self.materialize()
+
+    def materialize(self, /) -> Union[list, tuple, str]:
+        return self.base[_as_slice(self.indices)]
+
+
+def slice_of(values: Union[list, tuple, str, SliceView], key: slice, /):
+    # short slices and slices of a small part of the base are copied
+    if isinstance(values, SliceView):
+        base, indices = values.base, values.indices[key]
+    else:
+        base, indices = values, range(len(values))[key]
+
+    if (len(indices) < _VIEW_THRESHOLD or
+            len(indices) * _SPARSENESS < len(base)):
+        return base[_as_slice(indices)]
+    else:
+        return SliceView(base, indices)
@@ -4,6 +4,9 @@ Tester for Cocktail Lang
 
 Usage:
     test <program-id> [options]
+
+Options:
+    --unboxed       Keep numbers, strings and booleans as native values
 """
 
 from pathlib import Path
@@ -13,7 +16,9 @@ try:
 except (ImportError, ModuleNotFoundError):
     from docopt import docopt
 
-from cocktail.run import execute
+from cocktail.ast import RECURSION_LIMIT
+from cocktail.error import CocktailError
+from cocktail.run import execute_file
 
 
 def main(argv=None):
@@ -28,8 +33,11 @@ def main(argv=None):
         elif path.is_dir():
             exit(f'{Path(__file__)}: {path}: Is a directory')
 
-        with open(path) as file:
-            execute(file.read())
+        try:
+            execute_file(f'{path}', unboxed=args['--unboxed'],
+                         recursion_limit=RECURSION_LIMIT)
+        except CocktailError as err:
+            exit(f'{err}')
 
 
 if __name__ == '__main__':